@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Multi-threaded stress benchmark for the query result cache
+
+Runs a mixed workload (lookups, inserts, tag invalidations, stats and
+deletes) against the single-lock ResultCache and the lock-striped
+ShardedResultCache from many threads at once, then checks that each
+cache's byte and entry accounting is still consistent.
+
+Usage:
+    python scripts/cache_stress_benchmark.py
+    python scripts/cache_stress_benchmark.py --threads 1 4 16 32 --seconds 5 --shards 8
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / "webapp" / "backend"))
+
+from cache import ResultCache, ShardedResultCache, estimate_size  # noqa: E402
+
+
+def make_rows(count):
+    return [
+        {
+            'lobbyist_name': f'Lobbyist {i % 40}',
+            'client_name': f'Client {i % 90}',
+            'amount': float(i * 10),
+            'report_date': f'2024-{1 + i % 12:02d}-15',
+            'activity_description': f'Activity {i}',
+            'payment_type': 'fee'
+        }
+        for i in range(count)
+    ]
+
+
+def worker(cache, keys, payloads, deadline, counts, errors, seed):
+    rng = random.Random(seed)
+    operations = 0
+    try:
+        while time.perf_counter() < deadline:
+            key = rng.choice(keys)
+            roll = rng.random()
+            if roll < 0.80:
+                cache.lookup(key)
+            elif roll < 0.95:
+                year = rng.randint(2018, 2024)
+                cache.set(key, rng.choice(payloads), tags=('table:lobby_data', f'year:{year}'))
+            elif roll < 0.98:
+                cache.delete(key)
+            elif roll < 0.995:
+                cache.stats()
+            else:
+                cache.invalidate_tags([f'year:{rng.randint(2018, 2024)}'])
+            operations += 1
+    except Exception as e:  # A data race shows up here
+        errors.append(repr(e))
+    counts.append(operations)
+
+
+def check_consistency(cache):
+    """Recompute sizes from the live entries and compare with the counters."""
+    shards = getattr(cache, '_shards', [cache])
+    for shard in shards:
+        with shard._lock:
+            actual_bytes = sum(entry.size_bytes for entry in shard._entries.values())
+            if actual_bytes != shard._current_bytes:
+                return f"byte accounting drifted: {shard._current_bytes} != {actual_bytes}"
+            for tag, keys in shard._tag_index.items():
+                if not keys.issubset(shard._entries.keys()):
+                    return f"tag index references removed keys for {tag}"
+    return None
+
+
+def run(label, cache_factory, threads, seconds, key_count, payloads):
+    cache = cache_factory()
+    keys = [f'query_cache_{i:08x}' for i in range(key_count)]
+    for key in keys[:key_count // 2]:
+        cache.set(key, payloads[0], tags=('table:lobby_data',))
+
+    counts, errors = [], []
+    deadline = time.perf_counter() + seconds
+    pool = [
+        threading.Thread(target=worker, args=(cache, keys, payloads, deadline, counts, errors, seed))
+        for seed in range(threads)
+    ]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = sum(counts)
+    problem = errors[0] if errors else check_consistency(cache)
+    print(f"{label:<12} threads={threads:<3} ops={total:>10,} "
+          f"ops/s={total / elapsed:>12,.0f} entries={len(cache):>5} "
+          f"{'OK' if problem is None else 'FAIL: ' + problem}")
+    return problem is None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16, 32])
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--shards', type=int, default=8)
+    parser.add_argument('--keys', type=int, default=5000)
+    parser.add_argument('--rows', type=int, default=50, help='rows per cached result')
+    args = parser.parse_args()
+
+    payloads = [make_rows(args.rows), make_rows(max(1, args.rows // 5)), []]
+    max_entries = args.keys // 2
+    max_bytes = max_entries * estimate_size(payloads[0])
+
+    print("=" * 80)
+    print("CACHE STRESS BENCHMARK")
+    print("=" * 80)
+    print(f"keys={args.keys} max_entries={max_entries} rows/result={args.rows} "
+          f"shards={args.shards} seconds/run={args.seconds}")
+    print()
+
+    ok = True
+    for threads in args.threads:
+        ok &= run('single-lock', lambda: ResultCache(max_entries=max_entries, max_bytes=max_bytes),
+                  threads, args.seconds, args.keys, payloads)
+        ok &= run('sharded', lambda: ShardedResultCache(shards=args.shards, max_entries=max_entries,
+                                                        max_bytes=max_bytes),
+                  threads, args.seconds, args.keys, payloads)
+
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
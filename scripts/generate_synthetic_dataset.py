@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic CAL-ACCESS-scale lobbying dataset for benchmarking
+
+Emits schema-faithful synthetic versions of the BigQuery views the scripts
+and API read, at a configurable size:
+
+- v_filers: employers (LEM), lobbying firms (LFM) and lobbyists (LBY)
+- v_disclosures: quarterly F625/F635 filings with amendment chains
+  (amendment_id 0..n sharing a filing_id, each filed later)
+- v_payments: payment line items (--rows of them); a few employers account
+  for most payments (Zipf-distributed)
+- v_expenditures: expenditure line items (--rows / 10)
+- lobby_data: the denormalized search table served by the API, one row
+  per payment on the latest amendment of each filing
+
+Filing volume grows over the --start-year..--end-year range. Output is
+deterministic for a given --seed and --rows, and is written in fixed-size
+chunks so millions of rows do not need to fit in memory at once.
+
+The output directory can be served directly by the API's mock mode:
+    USE_MOCK_DATA=true MOCK_DATA_PATH=synthetic_data python webapp/backend/run.py
+
+Usage:
+    python scripts/generate_synthetic_dataset.py
+    python scripts/generate_synthetic_dataset.py --rows 5000000 --format parquet --seed 7
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+BASE_DIR = Path(__file__).parent.parent
+
+# Fixed so the output depends only on --seed and --rows
+CHUNK_ROWS = 250_000
+
+# Stream ids for per-table random generators
+FILERS, DISCLOSURES, PAYMENTS, EXPENDITURES = range(4)
+
+ORG_WORDS = ['PACIFIC', 'GOLDEN STATE', 'SIERRA', 'COASTAL', 'CENTRAL VALLEY', 'BAY AREA', 'SOUTHERN',
+             'NORTHERN', 'WESTERN', 'UNITED', 'ALAMEDA', 'SACRAMENTO', 'CAPITOL', 'REDWOOD', 'MISSION']
+ORG_SECTORS = ['WATER', 'ENERGY', 'HEALTH', 'TECHNOLOGY', 'TRANSPORTATION', 'AGRICULTURE', 'INSURANCE',
+               'HOUSING', 'EDUCATION', 'RETAIL', 'TELECOM', 'GAMING', 'LABOR', 'PHARMACEUTICAL', 'BANKING']
+ORG_SUFFIXES = ['ASSOCIATION', 'COALITION', 'CORPORATION', 'DISTRICT', 'COUNCIL', 'ALLIANCE', 'INC',
+                'AUTHORITY', 'FEDERATION', 'PARTNERS']
+LAST_NAMES = ['SMITH', 'GARCIA', 'NGUYEN', 'JOHNSON', 'LEE', 'MARTINEZ', 'BROWN', 'DAVIS', 'LOPEZ', 'KIM',
+              'WILSON', 'ANDERSON', 'PATEL', 'CHEN', 'RODRIGUEZ', 'TAYLOR', 'THOMAS', 'MOORE', 'YODER',
+              'SHAW', 'ANTWIH', 'JACKSON', 'WHITE', 'HARRIS', 'CLARK', 'LEWIS', 'WALKER', 'HALL']
+FIRST_NAMES = ['JOHN', 'MARIA', 'DAVID', 'JENNIFER', 'MICHAEL', 'LINDA', 'JAMES', 'SUSAN', 'ROBERT',
+               'KAREN', 'DANIEL', 'LISA', 'KEVIN', 'ANGELA', 'BRIAN', 'MICHELLE']
+FIRM_SUFFIXES = ['& ASSOCIATES', 'CONSULTING', 'GOVERNMENT RELATIONS', 'ADVOCACY GROUP', 'PUBLIC AFFAIRS',
+                 'STRATEGIES', 'LAW GROUP', 'PARTNERS']
+PAYEES = ['CAPITOL GRILL', 'SUTTER CLUB', 'HYATT REGENCY', 'ALAMEDA PRODUCE MARKET', 'CITIZEN HOTEL',
+          'FIRST CLASS PRINTING', 'AMTRAK', 'SOUTHWEST AIRLINES', 'ESQUIRE GRILL', 'PRINTING PLUS',
+          'STATE CAPITOL CATERING', 'CALIFORNIA CHAMBER EVENTS']
+EXPENSE_DESCRIPTIONS = ['meals', 'snack', 'reception', 'travel', 'lodging', 'printing', 'event tickets',
+                        'conference registration', 'gift', 'parking']
+ACTIVITY_TOPICS = ['Legislative advocacy', 'Regulatory comment', 'Agency meeting', 'Budget request',
+                   'Procurement discussion', 'Ballot measure outreach', 'Rulemaking testimony']
+
+
+def rng_for(seed, stream, chunk=0):
+    return np.random.default_rng([seed, stream, chunk])
+
+
+def zipf_probabilities(count, exponent):
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+def combination_names(count, *word_lists):
+    """count unique names built from the word lists, numbered once they run out."""
+    names = []
+    capacity = int(np.prod([len(words) for words in word_lists]))
+    for i in range(count):
+        parts, rest = [], i % capacity
+        for words in word_lists:
+            parts.append(words[rest % len(words)])
+            rest //= len(words)
+        if i >= capacity:
+            parts.append(str(i // capacity + 1))
+        names.append(' '.join(parts))
+    return names
+
+
+def group_positions(counts):
+    """0-based position of each element within its group, for groups of the given sizes."""
+    starts = np.cumsum(counts) - counts
+    return np.arange(int(counts.sum())) - np.repeat(starts, counts)
+
+
+def dates(values):
+    return pa.array(values.astype('datetime64[D]'), type=pa.date32())
+
+
+class TableWriter:
+    """Writes chunks of one table to CSV and/or Parquet."""
+
+    def __init__(self, directory, name, formats):
+        self.paths = {fmt: directory / f"{name}.{fmt}" for fmt in formats}
+        self.name = name
+        self.rows = 0
+        self._writers = {}
+
+    def write(self, table):
+        if not self._writers:
+            for fmt, path in self.paths.items():
+                if fmt == 'parquet':
+                    self._writers[fmt] = pq.ParquetWriter(path, table.schema)
+                else:
+                    self._writers[fmt] = pa_csv.CSVWriter(path, table.schema)
+        for writer in self._writers.values():
+            writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+        print(f"✓ {self.name}: {self.rows:,} rows")
+
+
+class SyntheticDataset:
+    """Generates the related tables; filers and disclosures are held in memory, line items are chunked."""
+
+    def __init__(self, rows, seed, start_year, end_year):
+        self.rows = rows
+        self.seed = seed
+        self.start_year = start_year
+        self.end_year = end_year
+
+    def generate_filers(self):
+        rng = rng_for(self.seed, FILERS)
+        count = max(100, self.rows // 40)
+        employers = int(count * 0.6)
+        firms = int(count * 0.15)
+        lobbyists = count - employers - firms
+
+        employer_names = combination_names(employers, ORG_WORDS, ORG_SECTORS, ORG_SUFFIXES)
+        firm_names = [f"{name} {FIRM_SUFFIXES[i % len(FIRM_SUFFIXES)]}"
+                      for i, name in enumerate(combination_names(firms, LAST_NAMES, LAST_NAMES))]
+        first = rng.integers(len(FIRST_NAMES), size=lobbyists)
+        last = rng.integers(len(LAST_NAMES), size=lobbyists)
+        lobbyist_first = [FIRST_NAMES[i] for i in first]
+        lobbyist_last = [LAST_NAMES[i] for i in last]
+
+        self.employer_ids = np.arange(1_200_000, 1_200_000 + employers)
+        self.firm_ids = np.arange(1_200_000 + employers, 1_200_000 + employers + firms)
+        self.employer_names = pa.array(employer_names)
+        self.firm_names = pa.array(firm_names)
+        # Popularity is assigned by random permutation so it is not tied to name order
+        self.employer_probabilities = zipf_probabilities(employers, 1.1)[rng.permutation(employers)]
+        self.firm_probabilities = zipf_probabilities(firms, 0.8)[rng.permutation(firms)]
+
+        first_day = np.datetime64(f'{self.start_year}-01-01')
+        span_days = (np.datetime64(f'{self.end_year}-12-31') - first_day).astype(int)
+        return pa.table({
+            'filer_id': np.arange(1_200_000, 1_200_000 + count),
+            'filer_type': ['LOBBYIST EMPLOYER'] * employers + ['LOBBYING FIRM'] * firms + ['LOBBYIST'] * lobbyists,
+            'entity_code': ['LEM'] * employers + ['LFM'] * firms + ['LBY'] * lobbyists,
+            'last_name': employer_names + firm_names + lobbyist_last,
+            'first_name': [None] * (employers + firms) + lobbyist_first,
+            'full_name': employer_names + firm_names + [f"{f} {l}" for f, l in zip(lobbyist_first, lobbyist_last)],
+            'status': np.where(rng.random(count) < 0.7, 'ACTIVE', 'TERMINATED'),
+            'effective_date': dates(first_day + rng.integers(0, span_days, size=count))
+        })
+
+    def generate_disclosures(self):
+        rng = rng_for(self.seed, DISCLOSURES)
+        originals = max(50, self.rows // 6)
+
+        # Firm quarterly reports (F625) and employer periodic reports (F635)
+        by_firm = rng.random(originals) < 0.6
+        firm_index = rng.choice(len(self.firm_ids), size=originals, p=self.firm_probabilities)
+        employer_index = rng.choice(len(self.employer_ids), size=originals, p=self.employer_probabilities)
+
+        # Filing volume grows over time
+        years = np.arange(self.start_year, self.end_year + 1)
+        year_weights = 1 + 0.08 * (years - self.start_year)
+        year = rng.choice(years, size=originals, p=year_weights / year_weights.sum())
+        quarter = rng.integers(0, 4, size=originals)
+        month = (year - 1970) * 12 + quarter * 3
+        period_start = month.astype('datetime64[M]').astype('datetime64[D]')
+        period_end = (month + 3).astype('datetime64[M]').astype('datetime64[D]') - 1
+        filed = period_end + rng.integers(1, 46, size=originals)
+
+        # Amendment chains: most filings are never amended, a few many times
+        amendments = np.minimum(rng.geometric(0.75, size=originals) - 1, 9)
+        versions = amendments + 1
+        origin = np.repeat(np.arange(originals), versions)
+        amendment_id = group_positions(versions)
+        # Each amendment is filed 2 weeks to ~13 months after the previous version
+        delays = np.where(amendment_id > 0, rng.integers(14, 400, size=len(origin)), 0)
+        running = np.cumsum(delays)
+        report_date = filed[origin] + running - np.repeat(running[np.cumsum(versions) - versions], versions)
+        # Nothing is filed after the last period's filing deadline
+        report_date = np.minimum(report_date, np.datetime64(f'{self.end_year + 1}-02-14'))
+
+        self.disclosure_by_firm = by_firm[origin]
+        self.disclosure_firm = firm_index[origin]
+        self.disclosure_employer = employer_index[origin]
+        self.disclosure_latest = amendment_id == amendments[origin]
+        self.disclosure_filing_id = 2_000_000 + origin
+        self.disclosure_amendment_id = amendment_id
+        self.disclosure_period_start = period_start[origin]
+        self.disclosure_report_date = report_date
+        self.disclosure_quarter = quarter[origin]
+        self.disclosure_year = year[origin]
+
+        firm_names = pc.take(self.firm_names, self.disclosure_firm)
+        filer_names = pc.if_else(pa.array(self.disclosure_by_firm), firm_names,
+                                 pc.take(self.employer_names, self.disclosure_employer))
+        return pa.table({
+            'filing_id': self.disclosure_filing_id,
+            'amendment_id': amendment_id,
+            'filer_id': np.where(self.disclosure_by_firm, self.firm_ids[self.disclosure_firm],
+                                 self.employer_ids[self.disclosure_employer]),
+            'filer_last_name': filer_names,
+            'filer_first_name': pa.nulls(len(origin), pa.string()),
+            'firm_id': self.firm_ids[self.disclosure_firm],
+            'firm_name': firm_names,
+            'entity_code': np.where(self.disclosure_by_firm, 'LFM', 'LEM'),
+            'form_type': np.where(self.disclosure_by_firm, 'F625', 'F635'),
+            'period_start_date': dates(self.disclosure_period_start),
+            'period_end_date': dates(period_end[origin]),
+            'report_date': dates(report_date)
+        })
+
+    def generate_payments(self, payments_writer, lobby_writer):
+        """Payment line items, plus lobby_data rows for the latest amendments."""
+        rng = rng_for(self.seed, PAYMENTS)
+        # Firms itemize many clients per filing; employers list few firms
+        weights = np.where(self.disclosure_by_firm, 5.0, 1.0) * rng.lognormal(0, 0.75, len(self.disclosure_by_firm))
+        lines = rng.multinomial(self.rows, weights / weights.sum())
+
+        ends = np.cumsum(lines)
+        boundaries = np.searchsorted(ends, np.arange(CHUNK_ROWS, self.rows, CHUNK_ROWS), side='right')
+        starts = np.concatenate([[0], boundaries])
+        stops = np.concatenate([boundaries, [len(lines)]])
+
+        next_id = 1
+        for chunk, (lo, hi) in enumerate(zip(starts, stops)):
+            counts = lines[lo:hi]
+            if counts.sum() == 0:
+                continue
+            rng = rng_for(self.seed, PAYMENTS, chunk + 1)
+            disclosure = np.repeat(np.arange(lo, hi), counts)
+            size = len(disclosure)
+            by_firm = self.disclosure_by_firm[disclosure]
+
+            # Firms report payments from clients; employers report their own payments
+            client = np.where(by_firm,
+                              rng.choice(len(self.employer_ids), size=size, p=self.employer_probabilities),
+                              self.disclosure_employer[disclosure])
+            fees = np.round(rng.lognormal(8.3, 1.1, size), 2)
+            reimbursement = np.where(rng.random(size) < 0.3, np.round(rng.lognormal(5, 1, size), 2), 0.0)
+            advance = np.where(rng.random(size) < 0.05, np.round(rng.lognormal(8, 1, size), 2), 0.0)
+            period_total = np.round(fees + reimbursement + advance, 2)
+            employer_names = pc.take(self.employer_names, client)
+
+            payments_writer.write(pa.table({
+                'filing_id': self.disclosure_filing_id[disclosure],
+                'amendment_id': self.disclosure_amendment_id[disclosure],
+                'line_item': group_positions(counts) + 1,
+                'employer_id': self.employer_ids[client],
+                'employer_last_name': employer_names,
+                'employer_first_name': pa.nulls(size, pa.string()),
+                'employer_full_name': employer_names,
+                'fees_amount': fees,
+                'reimbursement_amount': reimbursement,
+                'advance_amount': advance,
+                'period_total': period_total,
+                'cumulative_total': np.round(period_total * rng.integers(1, 9, size), 2),
+                'form_type': np.where(by_firm, 'F625P2', 'F635P3B'),
+                'payment_tier': np.select([period_total < 1000, period_total < 10000], ['Low', 'Medium'], 'High')
+            }))
+
+            latest = self.disclosure_latest[disclosure]
+            count = int(latest.sum())
+            topic = rng.integers(len(ACTIVITY_TOPICS), size=count)
+            kind = np.argmax(np.stack([fees, reimbursement, advance]), axis=0)[latest]
+            lobby_writer.write(pa.table({
+                'id': np.arange(next_id, next_id + count),
+                'lobbyist_name': pc.take(self.firm_names, self.disclosure_firm[disclosure][latest]),
+                'client_name': pc.filter(employer_names, pa.array(latest)),
+                'amount': period_total[latest],
+                'report_date': dates(self.disclosure_report_date[disclosure][latest]),
+                'activity_description': [
+                    f"{ACTIVITY_TOPICS[t]}, Q{q + 1} {y}"
+                    for t, q, y in zip(topic, self.disclosure_quarter[disclosure][latest],
+                                       self.disclosure_year[disclosure][latest])
+                ],
+                'payment_type': np.array(['fee', 'reimbursement', 'advance'])[kind]
+            }))
+            next_id += count
+
+    def generate_expenditures(self, writer):
+        total = max(10, self.rows // 10)
+        payees = pa.array(combination_names(len(PAYEES) * 20, PAYEES, [str(i) for i in range(1, 21)]))
+        payee_probabilities = zipf_probabilities(len(payees), 1.2)
+
+        for chunk, offset in enumerate(range(0, total, CHUNK_ROWS)):
+            size = min(CHUNK_ROWS, total - offset)
+            rng = rng_for(self.seed, EXPENDITURES, chunk)
+            disclosure = np.sort(rng.integers(len(self.disclosure_filing_id), size=size))
+            writer.write(pa.table({
+                'filing_id': self.disclosure_filing_id[disclosure],
+                'amendment_id': self.disclosure_amendment_id[disclosure],
+                'line_item': rng.integers(1, 20, size),
+                'transaction_id': [f"EXP{offset + i + 1}" for i in range(size)],
+                'payee_full_name': pc.take(payees, rng.choice(len(payees), size=size, p=payee_probabilities)),
+                'amount': np.round(rng.lognormal(4, 1.2, size), 2),
+                'expense_date': dates(self.disclosure_period_start[disclosure] + rng.integers(0, 90, size)),
+                'expense_description': np.array(EXPENSE_DESCRIPTIONS)[rng.integers(len(EXPENSE_DESCRIPTIONS), size=size)],
+                'form_type': pa.repeat('F635P3C', size)
+            }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='payment line items (others scale with it)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--format', nargs='+', choices=['csv', 'parquet'], default=['csv', 'parquet'])
+    parser.add_argument('--output', type=Path, default=BASE_DIR / 'synthetic_data')
+    parser.add_argument('--start-year', type=int, default=2000)
+    parser.add_argument('--end-year', type=int, default=2024)
+    args = parser.parse_args()
+
+    if args.rows < 1 or args.start_year > args.end_year:
+        parser.error('--rows must be positive and --start-year no later than --end-year')
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    print("=" * 80)
+    print("SYNTHETIC CAL-ACCESS DATASET")
+    print("=" * 80)
+    print(f"rows={args.rows:,} seed={args.seed} years={args.start_year}-{args.end_year} "
+          f"formats={','.join(args.format)} output={args.output}")
+    print()
+
+    start = time.perf_counter()
+    dataset = SyntheticDataset(args.rows, args.seed, args.start_year, args.end_year)
+    for name, generate in (('v_filers', dataset.generate_filers), ('v_disclosures', dataset.generate_disclosures)):
+        writer = TableWriter(args.output, name, args.format)
+        writer.write(generate())
+        writer.close()
+
+    payments = TableWriter(args.output, 'v_payments', args.format)
+    lobby_data = TableWriter(args.output, 'lobby_data', args.format)
+    dataset.generate_payments(payments, lobby_data)
+    payments.close()
+    lobby_data.close()
+
+    expenditures = TableWriter(args.output, 'v_expenditures', args.format)
+    dataset.generate_expenditures(expenditures)
+    expenditures.close()
+
+    print()
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
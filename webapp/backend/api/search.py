@@ -10,8 +10,9 @@ Based on:
 - Existing validation patterns from checkingfile
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from datetime import datetime
+import json
 import logging
 
 from middleware import handle_api_errors, validate_json_request
@@ -38,6 +39,10 @@ def search_lobby_data():
     - date_to: End date filter (YYYY-MM-DD)
     - page: Page number (default: 1)
     - per_page: Results per page (default: 50, max: 1000)
+    - paging: 'offset' (default) or 'cursor' for keyset pagination
+    - cursor: Continuation token from a previous page's next_cursor
+    - stream: 'ndjson' to stream rows as newline-delimited JSON instead of
+      a single JSON document (no pagination metadata)
     """
 
     try:
@@ -53,6 +58,8 @@ def search_lobby_data():
         # Pagination parameters
         page = max(1, request.args.get('page', 1, type=int))
         per_page = min(1000, max(1, request.args.get('per_page', 50, type=int)))
+        cursor = request.args.get('cursor', '').strip() or None
+        keyset = request.args.get('paging', 'offset').lower() == 'cursor'
 
         # Build filters dictionary
         filters = {}
@@ -104,7 +111,14 @@ def search_lobby_data():
 
         # Get data service and execute search
         data_service = get_data_service()
-        results = data_service.get_lobby_data(filters, per_page, offset)
+
+        if request.args.get('stream', '').lower() == 'ndjson':
+            batches = data_service.stream_lobby_data(filters, per_page, offset, budget='search')
+            logger.info(f"Streaming search results: page {page}, per_page {per_page}")
+            return _ndjson_response(batches)
+
+        results = data_service.get_lobby_data(filters, per_page, offset, cursor=cursor, keyset=keyset,
+                                              budget='search')
 
         # Prepare response
         response_data = {
@@ -121,6 +135,9 @@ def search_lobby_data():
             'timestamp': datetime.utcnow().isoformat()
         }
 
+        if 'next_cursor' in results:
+            response_data['pagination']['next_cursor'] = results['next_cursor']
+
         logger.info(f"Search completed: {len(results['data'])} results, page {page}")
         return jsonify(response_data)
 
@@ -128,6 +145,42 @@ def search_lobby_data():
         logger.error(f"Search error: {e}")
         raise
 
+def _ndjson_response(batches, filename=None):
+    """Stream row batches as newline-delimited JSON, one row per line."""
+    def generate():
+        for batch in batches:
+            yield ''.join(json.dumps(row, default=str) + '\n' for row in batch)
+
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    if filename:
+        response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+def _json_export_response(batches, envelope, filename):
+    """
+    Stream row batches inside the standard JSON export envelope.
+    The data array is written incrementally and record_count is emitted
+    after it, once the number of rows is known.
+    """
+    def generate():
+        header = json.dumps(envelope, default=str)
+        yield header[:-1] + ', "data": ['
+
+        record_count = 0
+        for batch in batches:
+            if not batch:
+                continue
+            prefix = ', ' if record_count else ''
+            yield prefix + ', '.join(json.dumps(row, default=str) for row in batch)
+            record_count += len(batch)
+
+        yield f'], "record_count": {record_count}}}'
+        logger.info(f"Streamed export complete: {record_count} records")
+
+    response = Response(stream_with_context(generate()), mimetype='application/json')
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
 @search_bp.route('/advanced', methods=['POST'])
 @handle_api_errors
 @validate_json_request(['query_type'])
@@ -294,23 +347,27 @@ def export_search_results():
 
     Request Body:
     {
-        "format": "csv|json|xlsx",
+        "format": "csv|json|xlsx|ndjson",
         "filters": {
             // Same filters as search endpoint
         },
-        "limit": 10000
+        "limit": 10000,
+        "stream": false  // stream rows as they arrive instead of buffering
     }
+
+    The ndjson format is always streamed.
     """
 
     data = request.get_json()
     export_format = data['format'].lower()
     filters = data.get('filters', {})
     limit = min(10000, data.get('limit', 1000))  # Max 10k records for export
+    stream = bool(data.get('stream', False)) or export_format == 'ndjson'
 
-    if export_format not in ['csv', 'json', 'xlsx']:
+    if export_format not in ['csv', 'json', 'xlsx', 'ndjson']:
         return jsonify({
             'error': 'Invalid export format',
-            'message': 'format must be one of: csv, json, xlsx',
+            'message': 'format must be one of: csv, json, xlsx, ndjson',
             'status_code': 400,
             'timestamp': datetime.utcnow().isoformat()
         }), 400
@@ -318,7 +375,23 @@ def export_search_results():
     try:
         # Get data service and fetch results for export
         data_service = get_data_service()
-        results = data_service.get_lobby_data(filters, limit, 0)
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+
+        if stream:
+            batches = data_service.stream_lobby_data(filters, limit, 0, budget='export')
+            logger.info(f"Streaming export: {export_format}, up to {limit} records")
+
+            if export_format == 'ndjson':
+                return _ndjson_response(batches, f'lobby_export_{timestamp}.ndjson')
+
+            return _json_export_response(batches, {
+                'success': True,
+                'format': export_format,
+                'filters_applied': filters,
+                'generated_at': datetime.utcnow().isoformat()
+            }, f'lobby_export_{timestamp}.json')
+
+        results = data_service.get_lobby_data(filters, limit, 0, budget='export')
 
         # Prepare export data
         export_data = {
@@ -332,7 +405,7 @@ def export_search_results():
 
         # Set appropriate response headers for download
         response = jsonify(export_data)
-        response.headers['Content-Disposition'] = f'attachment; filename=lobby_export_{datetime.utcnow().strftime("%Y%m%d_%H%M%S")}.json'
+        response.headers['Content-Disposition'] = f'attachment; filename=lobby_export_{timestamp}.json'
 
         logger.info(f"Export generated: {export_format}, {len(results['data'])} records")
         return response
@@ -10,7 +10,12 @@ Based on:
 - Phase 1.2 deployment pipeline capabilities
 """
 
-from flask import Flask, jsonify, request
+import time
+
+# Reference point for import-to-ready timings reported by /health
+APP_IMPORT_STARTED_AT = time.perf_counter()
+
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
@@ -54,6 +59,9 @@ def create_app():
     # Register API routes
     register_api_routes(app)
 
+    app.startup_timings = {'app_ready_seconds': round(time.perf_counter() - APP_IMPORT_STARTED_AT, 3)}
+    app.logger.info(f"✅ App ready {app.startup_timings['app_ready_seconds']}s after import")
+
     return app
 
 def configure_logging(app):
@@ -82,16 +90,20 @@ def configure_logging(app):
 def initialize_database(app):
     """
     Initialize database connection using Phase 1.1 patterns.
-    Set up connection pooling and validate connectivity.
+    The BigQuery client is built on first use; unless disabled it is warmed
+    up (and connectivity probed) on a background thread so startup does
+    not wait on the network.
     """
     with app.app_context():
         db = get_database()
-        client = db.initialize_connection()
 
-        if client:
-            app.logger.info("✅ Database connection initialized successfully")
+        if db.use_mock_data:
+            app.logger.info("🔧 Mock data mode - database warm-up skipped")
+        elif os.getenv('BIGQUERY_EAGER_WARMUP', 'true').lower() == 'true':
+            db.warm_up(started_at=APP_IMPORT_STARTED_AT)
+            app.logger.info("✅ Database client warming up in background")
         else:
-            app.logger.warning("⚠️ Database connection not available - check configuration")
+            app.logger.info("Database client will be created on first query")
 
         # Store database instance in app context
         app.db = db
@@ -111,16 +123,25 @@ def register_health_check(app):
         # Get database health status
         db_status = app.db.health_check()
 
+        if db_status['status'] in ['healthy', 'mock_mode']:
+            status = 'healthy'
+        elif db_status['status'] == 'circuit_open':
+            # Queries are failing fast; ask load balancers to shed traffic
+            status = 'unhealthy'
+        else:
+            status = 'degraded'
+
         health_data = {
-            'status': 'healthy' if db_status['status'] in ['healthy', 'mock_mode'] else 'degraded',
+            'status': status,
             'timestamp': datetime.utcnow().isoformat(),
             'service': 'ca-lobby-api',
             'version': '1.3.0',
             'environment': os.getenv('FLASK_ENV', 'development'),
-            'database': db_status
+            'database': db_status,
+            'startup': {**app.startup_timings, **app.db.startup_timings}
         }
 
-        status_code = 200 if health_data['status'] in ['healthy', 'degraded'] else 500
+        status_code = 200 if health_data['status'] in ['healthy', 'degraded'] else 503
         app.logger.info(f"Health check - status: {health_data['status']}")
 
         return jsonify(health_data), status_code
@@ -162,8 +183,11 @@ def register_api_routes(app):
             'performance': {
                 'cache_hit_rate': f"{cache_stats['cache_hit_rate_percent']}%",
                 'cached_queries': cache_stats['total_cached_queries'],
-                'database_status': db_health['status']
-            }
+                'database_status': db_health['status'],
+                'result_downloads': dict(db.download_counts),
+                'circuit_breaker': db.breaker.stats()
+            },
+            'local_replica': data_service.get_replica_status()
         }
 
         # Add user info if authenticated
@@ -210,23 +234,85 @@ def register_api_routes(app):
         from data_service import get_data_service
         data_service = get_data_service()
         stats = data_service.get_cache_stats()
+        entry_limit = min(1000, max(0, request.args.get('entries', 100, type=int)))
 
         return jsonify({
             'success': True,
             'cache_statistics': stats,
+            'cache_entries': data_service.get_cache_entry_states(entry_limit),
+            'query_metrics': data_service.get_query_metrics(),
             'timestamp': datetime.utcnow().isoformat()
         })
 
+    @app.route('/api/cache/metrics', methods=['GET'])
+    @handle_api_errors
+    def cache_metrics():
+        """Cache and query metrics in Prometheus text format for scraping."""
+        from data_service import get_data_service
+        data_service = get_data_service()
+
+        return Response(data_service.get_metrics_text(), mimetype='text/plain; version=0.0.4')
+
+    @app.route('/api/admin/query-stats', methods=['GET'])
+    @handle_api_errors
+    def query_stats():
+        """
+        Most expensive BigQuery query templates (admin only in production).
+
+        Query Parameters:
+        - top: number of templates (default: 10, max: 100)
+        - order_by: bytes_billed (default), bytes_processed, slot_ms, elapsed_ms or jobs
+        - recent: number of recent jobs to include (default: 0, max: 1000)
+        """
+        from auth import require_role
+
+        top = min(100, max(1, request.args.get('top', 10, type=int)))
+        order_by = request.args.get('order_by', 'bytes_billed')
+        recent = min(1000, max(0, request.args.get('recent', 0, type=int)))
+
+        def build_report():
+            job_stats = app.db.job_stats
+            return jsonify({
+                'success': True,
+                'order_by': order_by,
+                'top_templates': job_stats.top_templates(top, order_by),
+                'recent_jobs': job_stats.recent(recent) if recent else [],
+                'recorder': job_stats.stats(),
+                'timestamp': datetime.utcnow().isoformat()
+            })
+
+        # For development/testing, allow without auth
+        if os.getenv('FLASK_ENV') == 'development':
+            return build_report()
+
+        return require_role('admin')(build_report)()
+
     @app.route('/api/cache/clear', methods=['POST'])
     @handle_api_errors
     def clear_cache():
-        """Clear cache (admin only in production)."""
+        """
+        Clear cache (admin only in production).
+
+        Optional JSON body narrows what is cleared:
+        {"tags": ["year:2024", "year:open"], "match": "any|all"}
+        or {"pattern": "<key substring>"}. Without a body everything is cleared.
+        """
         from auth import require_role
+        from data_service import get_data_service
+
+        options = request.get_json(silent=True) or {}
+        clear_options = {
+            'pattern': options.get('pattern'),
+            'tags': options.get('tags'),
+            'match': options.get('match', 'any')
+        }
+        if clear_options['tags'] is not None and not isinstance(clear_options['tags'], list):
+            raise ValueError('tags must be a list of strings')
 
         @require_role('admin')
         def admin_clear_cache():
             data_service = get_data_service()
-            result = data_service.clear_cache()
+            result = data_service.clear_cache(**clear_options)
 
             return jsonify({
                 'success': True,
@@ -237,9 +323,8 @@ def register_api_routes(app):
 
         # For development/testing, allow without auth
         if os.getenv('FLASK_ENV') == 'development':
-            from data_service import get_data_service
             data_service = get_data_service()
-            result = data_service.clear_cache()
+            result = data_service.clear_cache(**clear_options)
 
             return jsonify({
                 'success': True,
@@ -0,0 +1,722 @@
+"""
+Query Result Cache for CA Lobby API
+
+Bounded in-memory cache engine used by the data access layer.
+Caps both the number of cached queries and their estimated memory footprint,
+evicts least-recently-used entries once full, and sweeps expired entries
+in a background thread so idle keys do not accumulate. Also provides
+single-flight coalescing so concurrent misses share one query execution.
+
+Entries have a soft TTL (stale_after) and a hard TTL (ttl). Between the two
+an entry is served as stale so callers can refresh it in the background;
+past the hard TTL it is gone.
+
+Entries can carry tags (source table, filter fields, date buckets). A tag
+index maps each tag to its keys so invalidation touches only the tagged
+entries instead of scanning or flushing the whole cache.
+
+Optionally, row results can be stored compacted: transposed into one array
+per column (so column names are stored once) and zlib-compressed, then
+decoded back into rows on every hit. This trades decode CPU for memory;
+the cache tracks both the stored and the logical size of each entry.
+
+ShardedResultCache stripes keys over several independently locked
+ResultCache shards so threaded workers do not serialize on one lock.
+
+Based on:
+- Phase 1.3b DataAccessService caching patterns (TTL per query result)
+- Phase 1.1 logging and error handling patterns
+"""
+
+import logging
+import pickle
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Estimate the in-memory size of a cached value in bytes.
+    Walks lists/dicts of query rows; deeper structures are approximated.
+    """
+    size = sys.getsizeof(value)
+    if _depth > 4:
+        return size
+
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += sys.getsizeof(key) + estimate_size(item, _depth + 1)
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            size += estimate_size(item, _depth + 1)
+
+    return size
+
+
+class CompactRows:
+    """
+    Column-oriented, zlib-compressed form of a list of row dicts.
+    Only built by the cache from its own results; the blob is pickled.
+    """
+
+    __slots__ = ('columns', 'blob', 'row_count')
+
+    def __init__(self, columns: Tuple[str, ...], blob: bytes, row_count: int):
+        self.columns = columns
+        self.blob = blob
+        self.row_count = row_count
+
+    @classmethod
+    def encode(cls, rows: Any, level: int = 6) -> Optional['CompactRows']:
+        """
+        Compact a list of dicts that all share the first row's keys.
+        Returns None for anything else, which is then cached as-is.
+        """
+        if not isinstance(rows, list) or not rows or not isinstance(rows[0], dict):
+            return None
+
+        columns = tuple(rows[0])
+        for row in rows:
+            if not isinstance(row, dict) or len(row) != len(columns) or any(
+                    column not in row for column in columns):
+                return None
+
+        arrays = [[row[column] for row in rows] for column in columns]
+        try:
+            payload = pickle.dumps(arrays, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return None
+        return cls(columns, zlib.compress(payload, level), len(rows))
+
+    def decode(self) -> List[Dict]:
+        arrays = pickle.loads(zlib.decompress(self.blob))
+        columns = self.columns
+        return [dict(zip(columns, values)) for values in zip(*arrays)]
+
+    def size(self) -> int:
+        return sys.getsizeof(self.blob) + estimate_size(self.columns) + sys.getsizeof(self)
+
+
+REFRESH_IDLE = 'idle'
+REFRESH_IN_PROGRESS = 'refreshing'
+REFRESH_FAILED = 'failed'
+
+
+class CacheEntry:
+    """Single cached query result with expiry, staleness and usage metadata."""
+
+    __slots__ = ('data', 'created_at', 'last_access', 'stale_at', 'expires_at', 'size_bytes',
+                 'logical_bytes', 'hits', 'refresh_state', 'refresh_count', 'last_refresh_error', 'tags')
+
+    def __init__(self, data: Any, ttl: float, size_bytes: int, stale_after: Optional[float] = None,
+                 tags: Optional[Iterable[str]] = None, logical_bytes: Optional[int] = None):
+        now = time.monotonic()
+        self.data = data
+        self.created_at = now
+        self.last_access = now
+        self.stale_at = now + (ttl if stale_after is None else min(stale_after, ttl))
+        self.expires_at = now + ttl
+        self.size_bytes = size_bytes
+        # Size of the uncompacted value; equals size_bytes for plain entries
+        self.logical_bytes = size_bytes if logical_bytes is None else logical_bytes
+        self.hits = 0
+        self.refresh_state = REFRESH_IDLE
+        self.refresh_count = 0
+        self.last_refresh_error = None
+        self.tags = frozenset(tags or ())
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.monotonic()) >= self.expires_at
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.monotonic()) >= self.stale_at
+
+
+class ResultCache:
+    """
+    LRU + TTL cache bounded by entry count and estimated bytes.
+
+    Entries are kept in recency order; inserting past either limit evicts
+    from the least-recently-used end. Expired entries are dropped lazily on
+    read and proactively by the background sweeper.
+
+    With compress=True, row results of at least compress_min_rows rows are
+    stored as CompactRows; the byte budget applies to the stored size.
+
+    max_entry_bytes (default: max_bytes) caps a single value. If it is above
+    max_bytes, a larger value is kept alone, with everything else evicted.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024,
+                 ttl: float = 300, sweep_interval: float = 60, stale_after: Optional[float] = None,
+                 compress: bool = False, compress_min_rows: int = 50, compress_level: int = 6,
+                 max_entry_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes if max_entry_bytes is None else max_entry_bytes
+        self.ttl = ttl
+        self.stale_after = stale_after
+        self.sweep_interval = sweep_interval
+        self.compress = compress
+        self.compress_min_rows = compress_min_rows
+        self.compress_level = compress_level
+
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._tag_index: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        self._current_bytes = 0
+        self._logical_bytes = 0
+        self._compact_entries = 0
+        self._decode_seconds = 0.0
+        self._evictions = 0
+        self._expirations = 0
+        self._stale_hits = 0
+
+        self._sweeper = None
+        self._stop_event = threading.Event()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return cached data for key, or None if missing or expired."""
+        return self.lookup(key)[0]
+
+    def lookup(self, key: str) -> Tuple[Optional[Any], bool]:
+        """
+        Return (data, stale) for key.
+        data is None if missing or past the hard TTL; stale is True once the
+        entry is past its soft TTL.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+
+            now = time.monotonic()
+            if entry.is_expired(now):
+                self._remove(key)
+                self._expirations += 1
+                logger.debug(f"Cache expired for key: {key[:50]}...")
+                return None, False
+
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            entry.last_access = now
+            stale = entry.is_stale(now)
+            if stale:
+                self._stale_hits += 1
+            data = entry.data
+
+        # Decode outside the lock so other lookups are not held up
+        if isinstance(data, CompactRows):
+            start_time = time.perf_counter()
+            data = data.decode()
+            elapsed = time.perf_counter() - start_time
+            with self._lock:
+                self._decode_seconds += elapsed
+        return data, stale
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Return the raw entry for key without touching recency or hits."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: str, data: Any, ttl: Optional[float] = None,
+            stale_after: Optional[float] = None, tags: Optional[Iterable[str]] = None) -> bool:
+        """
+        Store data under key.
+        Tags default to those of the entry being replaced, so refreshes keep
+        their invalidation tags. Returns False if the value alone is larger
+        than max_entry_bytes.
+        """
+        logical_bytes = estimate_size(data)
+        size_bytes = logical_bytes
+        if self.compress and isinstance(data, list) and len(data) >= self.compress_min_rows:
+            compact = CompactRows.encode(data, self.compress_level)
+            if compact is not None and compact.size() < logical_bytes:
+                data = compact
+                size_bytes = compact.size()
+
+        if size_bytes > self.max_entry_bytes:
+            logger.warning(f"Result too large to cache ({size_bytes} bytes): {key[:50]}...")
+            return False
+
+        entry = CacheEntry(data, self.ttl if ttl is None else ttl, size_bytes,
+                           self.stale_after if stale_after is None else stale_after, tags,
+                           logical_bytes=logical_bytes)
+
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None:
+                if tags is None:
+                    entry.tags = previous.tags
+                entry.refresh_count = previous.refresh_count
+                if previous.refresh_state == REFRESH_IN_PROGRESS:
+                    entry.refresh_count += 1
+                self._remove(key)
+
+            self._entries[key] = entry
+            self._account(entry, 1)
+            for tag in entry.tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+            self._evict_if_needed()
+
+        return True
+
+    def mark_refreshing(self, key: str) -> bool:
+        """
+        Claim a stale entry for background refresh.
+        Returns False if the entry is gone or a refresh is already running.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.refresh_state == REFRESH_IN_PROGRESS:
+                return False
+            entry.refresh_state = REFRESH_IN_PROGRESS
+            return True
+
+    def mark_refresh_failed(self, key: str, error: str) -> None:
+        """Record a failed background refresh so a later read can retry it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refresh_state = REFRESH_FAILED
+                entry.last_refresh_error = error
+
+    def entry_states(self, limit: int = 100) -> List[Dict]:
+        """Per-entry freshness and refresh state, most recently used first."""
+        now = time.monotonic()
+        with self._lock:
+            items = list(self._entries.items())[-limit:]
+
+        states = []
+        for key, entry in reversed(items):
+            states.append({
+                'key': key,
+                'age_seconds': round(now - entry.created_at, 1),
+                'idle_seconds': round(now - entry.last_access, 1),
+                'stale': entry.is_stale(now),
+                'expires_in_seconds': round(max(0, entry.expires_at - now), 1),
+                'hits': entry.hits,
+                'size_bytes': entry.size_bytes,
+                'logical_bytes': entry.logical_bytes,
+                'compact': isinstance(entry.data, CompactRows),
+                'refresh_state': entry.refresh_state,
+                'refresh_count': entry.refresh_count,
+                'tags': sorted(entry.tags),
+                'last_refresh_error': entry.last_refresh_error
+            })
+        return states
+
+    def delete(self, key: str) -> bool:
+        """Remove key from the cache. Returns True if it was present."""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def invalidate_tags(self, tags: Iterable[str], match: str = 'any') -> List[str]:
+        """
+        Remove entries carrying any (or, with match='all', every) of the tags.
+        Cost is proportional to the number of tagged entries. Returns the
+        removed keys.
+        """
+        tags = list(tags)
+        with self._lock:
+            key_sets = [self._tag_index.get(tag, set()) for tag in tags]
+            if not key_sets:
+                return []
+            if match == 'all':
+                keys = set.intersection(*sorted(key_sets, key=len))
+            else:
+                keys = set().union(*key_sets)
+
+            for key in keys:
+                self._remove(key)
+            return list(keys)
+
+    def tag_counts(self) -> Dict[str, int]:
+        """Number of live entries per tag."""
+        with self._lock:
+            return {tag: len(keys) for tag, keys in self._tag_index.items()}
+
+    def tag_names(self) -> Set[str]:
+        """Snapshot of tags carried by live entries."""
+        with self._lock:
+            return set(self._tag_index)
+
+    def size_bytes(self) -> int:
+        """Bytes currently held by cached entries."""
+        with self._lock:
+            return self._current_bytes
+
+    def clear(self) -> int:
+        """Remove every entry. Returns the number of entries removed."""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._tag_index.clear()
+            self._current_bytes = 0
+            self._logical_bytes = 0
+            self._compact_entries = 0
+            return count
+
+    def keys(self) -> List[str]:
+        """Snapshot of cached keys, least recently used first."""
+        with self._lock:
+            return list(self._entries.keys())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def sweep_expired(self) -> int:
+        """Drop all expired entries. Returns the number removed."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if entry.is_expired(now)]
+            for key in expired:
+                self._remove(key)
+            self._expirations += len(expired)
+
+        if expired:
+            logger.debug(f"Cache sweep removed {len(expired)} expired entries")
+        return len(expired)
+
+    def start_sweeper(self) -> None:
+        """Start the background expiry sweeper (idempotent)."""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, name='cache-sweeper', daemon=True)
+        self._sweeper.start()
+        logger.info(f"Cache sweeper started (interval: {self.sweep_interval}s)")
+
+    def stop_sweeper(self) -> None:
+        """Stop the background sweeper thread."""
+        self._stop_event.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=self.sweep_interval)
+            self._sweeper = None
+
+    def _sweep_loop(self) -> None:
+        while not self._stop_event.wait(self.sweep_interval):
+            try:
+                self.sweep_expired()
+            except Exception as e:
+                logger.error(f"Cache sweep failed: {e}")
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._account(entry, -1)
+        self._unindex(key, entry)
+
+    def _account(self, entry: CacheEntry, sign: int) -> None:
+        self._current_bytes += sign * entry.size_bytes
+        self._logical_bytes += sign * entry.logical_bytes
+        if isinstance(entry.data, CompactRows):
+            self._compact_entries += sign
+
+    def _unindex(self, key: str, entry: CacheEntry) -> None:
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def _evict_if_needed(self) -> None:
+        # The newest entry always stays, even if it alone exceeds max_bytes
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries
+                                          or self._current_bytes > self.max_bytes):
+            self._evict_lru()
+
+    def _evict_lru(self) -> int:
+        key, entry = self._entries.popitem(last=False)
+        self._account(entry, -1)
+        self._unindex(key, entry)
+        self._evictions += 1
+        logger.debug(f"Evicted LRU cache entry: {key[:50]}... ({entry.size_bytes} bytes)")
+        return entry.size_bytes
+
+    def evict_bytes(self, nbytes: int) -> int:
+        """Evict least-recently-used entries until nbytes are freed. Returns bytes freed."""
+        freed = 0
+        with self._lock:
+            while self._entries and freed < nbytes:
+                freed += self._evict_lru()
+        return freed
+
+    def stats(self) -> Dict:
+        """Cache occupancy and eviction counters."""
+        with self._lock:
+            total_hits = sum(entry.hits for entry in self._entries.values())
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'size_bytes': self._current_bytes,
+                'logical_bytes': self._logical_bytes,
+                'max_bytes': self.max_bytes,
+                'compact_entries': self._compact_entries,
+                'decode_seconds': round(self._decode_seconds, 4),
+                'hits': total_hits,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'stale_hits': self._stale_hits,
+                'tags': len(self._tag_index),
+                'refreshing': sum(1 for entry in self._entries.values()
+                                  if entry.refresh_state == REFRESH_IN_PROGRESS),
+                'sweeper_running': self._sweeper is not None and self._sweeper.is_alive()
+            }
+
+
+class ShardedResultCache:
+    """
+    Lock-striped ResultCache: keys are hashed onto independent shards,
+    each with its own lock, LRU order and share of the entry and byte
+    limits. Operations on different shards never contend. LRU eviction is
+    per shard, so it approximates a global LRU.
+
+    A single value may use the whole max_bytes, as with an unsharded cache.
+    A shard holding a value larger than its share keeps only that value, and
+    if the shards together exceed max_bytes the other shards evict
+    least-recently-used entries to make room.
+
+    Exposes the same interface as ResultCache; whole-cache operations
+    (stats, clear, tag invalidation) visit the shards one at a time.
+    """
+
+    def __init__(self, shards: int = 16, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024,
+                 ttl: float = 300, sweep_interval: float = 60, stale_after: Optional[float] = None,
+                 compress: bool = False, compress_min_rows: int = 50, compress_level: int = 6):
+        shards = max(1, shards)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_after = stale_after
+        self.sweep_interval = sweep_interval
+        self.compress = compress
+
+        self._shards = [
+            ResultCache(
+                max_entries=max(1, max_entries // shards),
+                max_bytes=max(1, max_bytes // shards),
+                ttl=ttl,
+                sweep_interval=sweep_interval,
+                stale_after=stale_after,
+                compress=compress,
+                compress_min_rows=compress_min_rows,
+                compress_level=compress_level,
+                max_entry_bytes=max_bytes
+            )
+            for _ in range(shards)
+        ]
+
+        self._sweeper = None
+        self._stop_event = threading.Event()
+
+    def _shard(self, key: str) -> ResultCache:
+        # Stable across processes, unlike hash() with string randomization
+        return self._shards[zlib.crc32(key.encode('utf-8')) % len(self._shards)]
+
+    @property
+    def shard_count(self) -> int:
+        return len(self._shards)
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._shard(key).get(key)
+
+    def lookup(self, key: str) -> Tuple[Optional[Any], bool]:
+        return self._shard(key).lookup(key)
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        return self._shard(key).get_entry(key)
+
+    def set(self, key: str, data: Any, ttl: Optional[float] = None,
+            stale_after: Optional[float] = None, tags: Optional[Iterable[str]] = None) -> bool:
+        shard = self._shard(key)
+        if not shard.set(key, data, ttl=ttl, stale_after=stale_after, tags=tags):
+            return False
+
+        # Only an entry larger than its shard's share can push the total over
+        excess = sum(other.size_bytes() for other in self._shards) - self.max_bytes
+        for other in self._shards:
+            if excess <= 0:
+                break
+            if other is not shard:
+                excess -= other.evict_bytes(excess)
+        return True
+
+    def mark_refreshing(self, key: str) -> bool:
+        return self._shard(key).mark_refreshing(key)
+
+    def mark_refresh_failed(self, key: str, error: str) -> None:
+        self._shard(key).mark_refresh_failed(key, error)
+
+    def delete(self, key: str) -> bool:
+        return self._shard(key).delete(key)
+
+    def entry_states(self, limit: int = 100) -> List[Dict]:
+        """Per-entry state across shards, most recently used first."""
+        states = []
+        for shard in self._shards:
+            states.extend(shard.entry_states(limit))
+        states.sort(key=lambda state: state['idle_seconds'])
+        return states[:limit]
+
+    def invalidate_tags(self, tags: Iterable[str], match: str = 'any') -> List[str]:
+        tags = list(tags)
+        removed = []
+        for shard in self._shards:
+            removed.extend(shard.invalidate_tags(tags, match))
+        return removed
+
+    def tag_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for shard in self._shards:
+            for tag, count in shard.tag_counts().items():
+                counts[tag] = counts.get(tag, 0) + count
+        return counts
+
+    def clear(self) -> int:
+        return sum(shard.clear() for shard in self._shards)
+
+    def keys(self) -> List[str]:
+        keys = []
+        for shard in self._shards:
+            keys.extend(shard.keys())
+        return keys
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._shard(key)
+
+    def sweep_expired(self) -> int:
+        return sum(shard.sweep_expired() for shard in self._shards)
+
+    def start_sweeper(self) -> None:
+        """Start one background sweeper for all shards (idempotent)."""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, name='cache-sweeper', daemon=True)
+        self._sweeper.start()
+        logger.info(f"Cache sweeper started (interval: {self.sweep_interval}s, shards: {len(self._shards)})")
+
+    def stop_sweeper(self) -> None:
+        self._stop_event.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=self.sweep_interval)
+            self._sweeper = None
+
+    def _sweep_loop(self) -> None:
+        while not self._stop_event.wait(self.sweep_interval):
+            try:
+                self.sweep_expired()
+            except Exception as e:
+                logger.error(f"Cache sweep failed: {e}")
+
+    def stats(self) -> Dict:
+        """Occupancy and eviction counters summed over shards."""
+        totals: Dict[str, Any] = {}
+        for shard in self._shards:
+            for name, value in shard.stats().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    totals[name] = totals.get(name, 0) + value
+
+        totals['decode_seconds'] = round(totals.get('decode_seconds', 0), 4)
+        tags = set()
+        for shard in self._shards:
+            tags.update(shard.tag_names())
+        totals['tags'] = len(tags)
+        totals['max_entries'] = self.max_entries
+        totals['max_bytes'] = self.max_bytes
+        totals['shards'] = len(self._shards)
+        totals['sweeper_running'] = self._sweeper is not None and self._sweeper.is_alive()
+        return totals
+
+
+class _InFlightCall:
+    """Result slot shared by the leader and followers of one in-flight call."""
+
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one execution.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running wait for and share its result or exception.
+    """
+
+    def __init__(self, wait_timeout: Optional[float] = None):
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _InFlightCall] = {}
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(self, key: str, fn) -> Tuple[Any, bool]:
+        """
+        Run fn() once per key across concurrent callers.
+        Returns (result, shared) where shared is True for coalesced callers.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._coalesced += 1
+                leader = False
+            else:
+                call = _InFlightCall()
+                self._calls[key] = call
+                self._executions += 1
+                leader = True
+
+        if not leader:
+            if not call.done.wait(self.wait_timeout):
+                raise TimeoutError(f"Timed out waiting for in-flight query: {key[:50]}...")
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+        if call.waiters:
+            logger.debug(f"Coalesced {call.waiters} waiting requests for key: {key[:50]}...")
+        return call.result, False
+
+    def stats(self) -> Dict:
+        """Execution and coalescing counters."""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'executions': self._executions,
+                'coalesced': self._coalesced
+            }
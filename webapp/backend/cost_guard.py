@@ -0,0 +1,192 @@
+"""
+Query Cost Guard for CA Lobby API
+
+Bounds how much data generated queries may scan. Before a query runs on
+BigQuery it is dry-run to estimate bytes processed; estimates are cached
+per query shape and the years of its DATE parameters (which drive
+partition pruning), matching the year: cache tags. Date ranges within the
+same years share an estimate, so it is approximate; maximum_bytes_billed
+remains the hard cap. Each endpoint has a budget:
+
+- max_bytes: queries estimated above this are rejected with
+  QueryTooExpensiveError; it is also sent as maximum_bytes_billed so
+  BigQuery enforces it even when the estimate is unavailable
+- batch_above: queries estimated above this run at BATCH priority so
+  they do not compete with interactive traffic (None disables)
+- timeout: seconds the caller waits for the job
+
+Budgets are configured with QUERY_BUDGET_<ENDPOINT>_MAX_GB,
+QUERY_BUDGET_<ENDPOINT>_BATCH_ABOVE_GB and
+QUERY_BUDGET_<ENDPOINT>_TIMEOUT_SECONDS; COST_GUARD_ENABLED=false skips
+the dry run (maximum_bytes_billed and timeouts still apply). While the
+database circuit breaker is open the dry run is skipped too, so shed
+traffic does not still wait on BigQuery before failing fast.
+
+Based on:
+- Phase 1.1 BigQuery query optimization patterns
+- Phase 1.1 environment variable configuration patterns
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Dict, List, Optional
+
+from metrics import query_shape
+
+logger = logging.getLogger(__name__)
+
+GB = 1024 ** 3
+
+# Per-endpoint limits; batch_above=None means never downgrade priority
+QueryBudget = namedtuple('QueryBudget', ['name', 'max_bytes', 'batch_above', 'timeout'])
+
+# How a query should be executed once it passes the guard
+ExecutionPlan = namedtuple('ExecutionPlan', ['estimated_bytes', 'max_bytes_billed', 'priority', 'timeout'])
+
+DEFAULT_BUDGETS = {
+    'search': QueryBudget('search', 10 * GB, None, 30),
+    'export': QueryBudget('export', 50 * GB, 5 * GB, 300),
+    'default': QueryBudget('default', 20 * GB, None, 120),
+}
+
+
+class QueryTooExpensiveError(ValueError):
+    """Raised when a query's estimated scan exceeds its endpoint budget."""
+
+    def __init__(self, budget: QueryBudget, estimated_bytes: int):
+        self.budget = budget
+        self.estimated_bytes = estimated_bytes
+        super().__init__(
+            f"Query would scan about {estimated_bytes / GB:.1f} GB, over the "
+            f"{budget.max_bytes / GB:.1f} GB limit for {budget.name} requests. "
+            f"Narrow the search, for example with a date range or more specific names."
+        )
+
+
+def _env_gb(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    if value.lower() in ('', 'none', 'off'):
+        return None
+    return int(float(value) * GB)
+
+
+def load_budgets() -> Dict[str, QueryBudget]:
+    """Default budgets with environment overrides applied."""
+    budgets = {}
+    for name, budget in DEFAULT_BUDGETS.items():
+        prefix = f'QUERY_BUDGET_{name.upper()}'
+        budgets[name] = QueryBudget(
+            name,
+            _env_gb(f'{prefix}_MAX_GB', budget.max_bytes),
+            _env_gb(f'{prefix}_BATCH_ABOVE_GB', budget.batch_above),
+            float(os.getenv(f'{prefix}_TIMEOUT_SECONDS', budget.timeout))
+        )
+    return budgets
+
+
+class CostGuard:
+    """Dry-run estimator with a per-shape estimate cache and budget enforcement."""
+
+    def __init__(self, db, budgets: Optional[Dict[str, QueryBudget]] = None, enabled: bool = True,
+                 estimate_ttl: float = 3600, max_estimates: int = 1000):
+        self.db = db
+        self.budgets = budgets or load_budgets()
+        self.enabled = enabled
+        self.estimate_ttl = estimate_ttl
+        self.max_estimates = max_estimates
+
+        self._estimates: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'dry_runs': 0, 'estimate_hits': 0, 'rejected': 0, 'batch_priority': 0,
+                          'skipped_breaker_open': 0}
+
+    def budget(self, name: Optional[str]) -> QueryBudget:
+        return self.budgets.get(name or 'default', self.budgets['default'])
+
+    def _estimate_key(self, sql: str, query_params: Optional[List]) -> tuple:
+        # Bucketed by year so each new date range does not cost another dry run
+        years = tuple((name, str(value)[:4]) for name, param_type, value in (query_params or [])
+                      if param_type == 'DATE')
+        return query_shape(sql), years
+
+    def estimate(self, sql: str, query_params: Optional[List] = None) -> Optional[int]:
+        """Estimated bytes processed, from cache or a dry run. None if unknown."""
+        key = self._estimate_key(sql, query_params)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._estimates.get(key)
+            if cached is not None and now - cached[1] < self.estimate_ttl:
+                self._estimates.move_to_end(key)
+                self._counters['estimate_hits'] += 1
+                return cached[0]
+
+        breaker = getattr(self.db, 'breaker', None)
+        if breaker is not None and breaker.state == breaker.OPEN:
+            with self._lock:
+                self._counters['skipped_breaker_open'] += 1
+            return None
+
+        estimated_bytes = self.db.dry_run(sql, query_params=query_params)
+        with self._lock:
+            self._counters['dry_runs'] += 1
+            if estimated_bytes is not None:
+                self._estimates[key] = (estimated_bytes, now)
+                self._estimates.move_to_end(key)
+                while len(self._estimates) > self.max_estimates:
+                    self._estimates.popitem(last=False)
+        return estimated_bytes
+
+    def plan(self, sql: str, query_params: Optional[List] = None,
+             budget_name: Optional[str] = None) -> ExecutionPlan:
+        """
+        Decide how to run a query under a budget.
+        Raises QueryTooExpensiveError if the estimate exceeds max_bytes.
+        """
+        budget = self.budget(budget_name)
+        estimated_bytes = self.estimate(sql, query_params) if self.enabled else None
+
+        priority = 'interactive'
+        if estimated_bytes is not None:
+            if budget.max_bytes is not None and estimated_bytes > budget.max_bytes:
+                with self._lock:
+                    self._counters['rejected'] += 1
+                logger.warning(f"⚠️ Rejected {budget.name} query over budget: "
+                               f"{estimated_bytes} bytes (shape {query_shape(sql)})")
+                raise QueryTooExpensiveError(budget, estimated_bytes)
+            if budget.batch_above is not None and estimated_bytes > budget.batch_above:
+                priority = 'batch'
+                with self._lock:
+                    self._counters['batch_priority'] += 1
+                logger.info(f"Routing expensive {budget.name} query to batch priority: {estimated_bytes} bytes")
+
+        return ExecutionPlan(estimated_bytes, budget.max_bytes, priority, budget.timeout)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'cached_estimates': len(self._estimates),
+                **self._counters,
+                'budgets': {
+                    name: {
+                        'max_gb': round(budget.max_bytes / GB, 2) if budget.max_bytes else None,
+                        'batch_above_gb': round(budget.batch_above / GB, 2) if budget.batch_above else None,
+                        'timeout_seconds': budget.timeout
+                    }
+                    for name, budget in self.budgets.items()
+                }
+            }
+
+
+def create_cost_guard(db) -> CostGuard:
+    """Build the cost guard from environment configuration."""
+    return CostGuard(
+        db,
+        enabled=os.getenv('COST_GUARD_ENABLED', 'true').lower() == 'true',
+        estimate_ttl=float(os.getenv('COST_ESTIMATE_TTL_SECONDS', 3600))
+    )
@@ -11,18 +11,55 @@ Based on:
 - Error handling and recovery from existing scripts
 """
 
+import base64
+import hashlib
 import logging
+import os
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from functools import lru_cache
-from datetime import datetime, timedelta
+from datetime import datetime
 import pandas as pd
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Any
 import json
+import re
+
+try:
+    import pyarrow
+except ImportError:  # Optional: enables the columnar result conversion path
+    pyarrow = None
 
 from database import get_database
+from cache import ShardedResultCache, SingleFlight
+from shared_cache import create_shared_cache
+from query_builder import BoundQuery, LobbyQueryBuilder, QueryParameter
+from replica import create_replica
+from metrics import QueryMetrics
+from prefetch import create_prefetcher
+from cost_guard import ExecutionPlan, create_cost_guard
 
 logger = logging.getLogger(__name__)
 
+_NON_WORD_CHARS = re.compile(r'[^\w]')
+_REPEATED_UNDERSCORES = re.compile(r'_+')
+
+
+@lru_cache(maxsize=1024)
+def standardize_column_name(column_name: str) -> str:
+    """
+    Standardize column names following Phase 1.1 patterns.
+    Based on Column_rename.py standardization approach. Cached, since the
+    same handful of column names is seen on every result set.
+    """
+    # Convert to lowercase and replace spaces/special chars with underscores
+    standardized = column_name.lower().replace(' ', '_').replace('-', '_')
+
+    # Remove special characters
+    standardized = _NON_WORD_CHARS.sub('_', standardized)
+
+    # Remove multiple underscores
+    return _REPEATED_UNDERSCORES.sub('_', standardized).strip('_')
+
 class DataAccessService:
     """
     Data access service layer implementing Phase 1.1 patterns.
@@ -31,88 +68,372 @@ class DataAccessService:
 
     def __init__(self):
         self.db = get_database()
-        self.cache = {}
-        self.cache_ttl = 300  # 5 minutes default TTL
-
-    def _get_cache_key(self, query: str, params: Dict = None) -> str:
-        """Generate cache key from query and parameters."""
+        self.cache_ttl = int(os.getenv('CACHE_TTL_SECONDS', 300))  # 5 minutes default TTL
+        # Entries between cache_ttl and cache_hard_ttl are served stale and
+        # refreshed in the background; equal values disable stale serving
+        self.cache_hard_ttl = max(self.cache_ttl, int(os.getenv('CACHE_HARD_TTL_SECONDS', self.cache_ttl)))
+        # Empty results are cached on their own, shorter TTL; failed queries
+        # (None from the database layer) are never cached
+        self.negative_cache_enabled = os.getenv('NEGATIVE_CACHE_ENABLED', 'true').lower() == 'true'
+        self.negative_cache_ttl = int(os.getenv('NEGATIVE_CACHE_TTL_SECONDS', 60))
+        # CACHE_SHARDS > 1 stripes the cache over independently locked shards.
+        # Under the GIL one lock measured faster (cache_stress_benchmark.py),
+        # so striping is opt-in, e.g. for free-threaded builds
+        self.cache = ShardedResultCache(
+            shards=int(os.getenv('CACHE_SHARDS', 1)),
+            max_entries=int(os.getenv('CACHE_MAX_ENTRIES', 1000)),
+            max_bytes=int(os.getenv('CACHE_MAX_MB', 64)) * 1024 * 1024,
+            ttl=self.cache_hard_ttl,
+            stale_after=self.cache_ttl,
+            sweep_interval=int(os.getenv('CACHE_SWEEP_INTERVAL_SECONDS', 60)),
+            # Store larger row results column-wise and zlib-compressed
+            compress=os.getenv('CACHE_COMPRESSION', 'false').lower() == 'true',
+            compress_min_rows=int(os.getenv('CACHE_COMPRESSION_MIN_ROWS', 50)),
+            compress_level=int(os.getenv('CACHE_COMPRESSION_LEVEL', 6))
+        )
+        self.cache.start_sweeper()
+        self.shared_cache = create_shared_cache()
+        self.metrics = QueryMetrics()
+        self.inflight = SingleFlight(wait_timeout=float(os.getenv('INFLIGHT_WAIT_TIMEOUT_SECONDS', 120)))
+        self.refresh_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('CACHE_REFRESH_WORKERS', 2)),
+            thread_name_prefix='cache-refresh'
+        )
+        self.query_builder = LobbyQueryBuilder(self._lobby_table())
+        self.stream_batch_size = int(os.getenv('STREAM_BATCH_SIZE', 500))
+        # Convert BigQuery results column-wise via Arrow when pyarrow is installed
+        self.arrow_results = os.getenv('ARROW_RESULTS', 'true').lower() == 'true'
+        # Optional local Parquet/DuckDB copy of lobby_data; BigQuery remains the fallback
+        self.replica = create_replica(self.db, self._lobby_table())
+        # Fetch page rows and the filtered total in one job via a window count
+        self.fused_count_query = os.getenv('FUSED_COUNT_QUERY', 'true').lower() == 'true'
+        # Opt-in speculative fetch of the next page into the cache
+        self.prefetcher = create_prefetcher()
+        # Dry-run estimates and per-endpoint bytes/timeout budgets for BigQuery jobs
+        self.cost_guard = create_cost_guard(self.db)
+        # Runs independent queries of one request (e.g. page and count) concurrently
+        self.batch_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('QUERY_BATCH_WORKERS', 8)),
+            thread_name_prefix='query-batch'
+        )
+
+    def _lobby_table(self) -> str:
+        """Fully qualified lobby_data table reference."""
+        if self.db.project_id:
+            return f"`{self.db.project_id}.{self.db.dataset_id}.lobby_data`"
+        return f"`{self.db.dataset_id}.lobby_data`"
+
+    def _get_cache_key(self, query: str, params: Dict = None,
+                       query_params: Optional[List[QueryParameter]] = None) -> str:
+        """
+        Generate a content-addressed cache key from query and parameters.
+        Uses a SHA-256 digest of the whitespace-normalized query, sorted
+        params and bound query parameter values so the same request maps to
+        the same key in every process.
+        """
         cache_data = {
-            'query': query,
+            'query': ' '.join(query.split()),
             'params': params or {}
         }
-        return f"query_cache_{hash(json.dumps(cache_data, sort_keys=True))}"
-
-    def _is_cache_valid(self, cache_entry: Dict) -> bool:
-        """Check if cache entry is still valid."""
-        if 'timestamp' not in cache_entry:
-            return False
-
-        cache_time = cache_entry['timestamp']
-        expiry_time = cache_time + timedelta(seconds=self.cache_ttl)
-        return datetime.utcnow() < expiry_time
-
-    def _cache_result(self, cache_key: str, data: Any) -> None:
-        """Cache query result with timestamp."""
-        self.cache[cache_key] = {
-            'data': data,
-            'timestamp': datetime.utcnow(),
-            'hits': 0
-        }
-        logger.debug(f"Cached result for key: {cache_key[:50]}...")
+        if query_params:
+            cache_data['query_params'] = {param.name: param.value for param in query_params}
+        serialized = json.dumps(cache_data, sort_keys=True, default=str, separators=(',', ':'))
+        return f"query_cache_{hashlib.sha256(serialized.encode('utf-8')).hexdigest()}"
+
+    def _cache_result(self, cache_key: str, data: Any, tags: Optional[Iterable[str]] = None) -> None:
+        """
+        Cache query result locally and in the shared backend, if configured.
+        Tags index the entry for targeted invalidation (see clear_cache).
+        Empty results use the negative cache TTL, or are skipped if negative
+        caching is disabled.
+        """
+        if data == [] and not self.negative_cache_enabled:
+            return
+        soft_ttl, hard_ttl = self._cache_ttls(data)
+
+        if self.cache.set(cache_key, data, ttl=hard_ttl, stale_after=soft_ttl, tags=tags):
+            logger.debug(f"Cached {'empty ' if not data else ''}result for key: {cache_key[:50]}...")
+
+        if self.shared_cache is not None:
+            try:
+                self.shared_cache.set(cache_key, data, soft_ttl, tags=tags)
+            except Exception as e:
+                logger.warning(f"Shared cache write failed: {e}")
+
+    def _cache_ttls(self, data: Any):
+        """(soft, hard) TTLs for a result; empty results use the negative cache TTL."""
+        if data == []:
+            return self.negative_cache_ttl, self.negative_cache_ttl
+        return self.cache_ttl, self.cache_hard_ttl
 
     def _get_cached_result(self, cache_key: str) -> Optional[Any]:
-        """Retrieve cached result if valid."""
-        if cache_key not in self.cache:
-            return None
+        """Retrieve cached result if present and not past its hard TTL."""
+        return self._lookup_cached_result(cache_key)[0]
 
-        cache_entry = self.cache[cache_key]
-        if not self._is_cache_valid(cache_entry):
-            del self.cache[cache_key]
-            logger.debug(f"Cache expired for key: {cache_key[:50]}...")
+    def _lookup_cached_result(self, cache_key: str):
+        """
+        Retrieve (data, stale) for a cache key.
+        Checks the local cache first, then the shared backend; shared hits
+        are promoted into the local cache and treated as fresh.
+        """
+        data, stale = self.cache.lookup(cache_key)
+        if data is None:
+            return self._get_shared_result(cache_key), False
+
+        entry = self.cache.get_entry(cache_key)
+        hits = entry.hits if entry is not None else 0
+        logger.debug(f"Cache hit for key: {cache_key[:50]}... (hits: {hits}, stale: {stale})")
+        return data, stale
+
+    def _get_shared_result(self, cache_key: str) -> Optional[Any]:
+        """Look up a key in the shared backend and promote it locally."""
+        if self.shared_cache is None:
             return None
 
-        # Update hit counter
-        cache_entry['hits'] += 1
-        logger.debug(f"Cache hit for key: {cache_key[:50]}... (hits: {cache_entry['hits']})")
-        return cache_entry['data']
+        try:
+            entry = self.shared_cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Shared cache read failed: {e}")
+            return None
 
-    def execute_cached_query(self, query: str, params: Dict = None) -> Optional[List[Dict]]:
+        if entry is None:
+            return None
+        # Keep the stored tags so clear_cache(tags=...) also drops the local copy
+        soft_ttl, hard_ttl = self._cache_ttls(entry.data)
+        if entry.ttl is not None:
+            # Entries are shared for soft_ttl; time already spent there counts
+            # against both local TTLs so promotion never extends a result's life
+            age = max(0.0, soft_ttl - entry.ttl)
+            soft_ttl, hard_ttl = max(0.0, soft_ttl - age), max(0.0, hard_ttl - age)
+        self.cache.set(cache_key, entry.data, ttl=hard_ttl, stale_after=soft_ttl, tags=entry.tags)
+        logger.debug(f"Shared cache hit for key: {cache_key[:50]}...")
+        return entry.data
+
+    def execute_cached_query(self, query: str, params: Dict = None,
+                             query_params: Optional[List[QueryParameter]] = None,
+                             tags: Optional[Iterable[str]] = None,
+                             budget: Optional[str] = None) -> Optional[List[Dict]]:
         """
         Execute query with caching support.
         Applies Phase 1.1 query optimization patterns.
+
+        query_params are bound to @name placeholders in the SQL by the
+        database layer and are part of the cache key. tags are attached to
+        the cached entry for targeted invalidation. budget names the cost
+        budget (see cost_guard) a BigQuery execution runs under; queries over
+        it raise QueryTooExpensiveError.
         """
-        cache_key = self._get_cache_key(query, params)
+        cache_key = self._get_cache_key(query, params, query_params)
+        start_time = time.perf_counter()
 
-        # Try to get from cache first
-        cached_result = self._get_cached_result(cache_key)
+        # Try to get from cache first; stale entries are served immediately
+        # and refreshed in the background
+        cached_result, stale = self._lookup_cached_result(cache_key)
         if cached_result is not None:
-            logger.info(f"Query served from cache: {len(cached_result)} records")
+            self.metrics.increment('hits', query=query)
+            if not cached_result:
+                self.metrics.increment('negative_hits', query=query)
+            if stale:
+                self.metrics.increment('stale_hits', query=query)
+                self._schedule_refresh(query, cache_key, query_params, budget)
+            self.metrics.observe('cache', time.perf_counter() - start_time, query)
+            logger.info(f"Query served from cache: {len(cached_result)} records{' (stale)' if stale else ''}")
             return cached_result
 
-        # Execute query if not cached
+        self.metrics.increment('misses', query=query)
+
+        # Execute query if not cached; concurrent misses for the same key
+        # share a single BigQuery job (including a prefetch already running)
+        results, coalesced = self.inflight.do(
+            cache_key,
+            lambda: self._execute_live(query, cache_key, query_params=query_params, tags=tags, budget=budget)
+        )
+        if coalesced:
+            self.metrics.increment('coalesced', query=query)
+            self.metrics.observe('coalesced', time.perf_counter() - start_time, query)
+            logger.info(f"Query coalesced with in-flight request: {cache_key[:50]}...")
+        return results
+
+    def execute_cached_queries(self, queries: List[BoundQuery],
+                               budget: Optional[str] = None) -> List[Optional[List[Dict]]]:
+        """
+        Run several independent cached queries concurrently.
+        Cached results are served inline; misses run in parallel, each
+        bounded by the budget's timeout, so latency is the slowest query
+        rather than the sum. A query that times out yields None (it keeps
+        running and fills the cache); other errors are raised.
+        """
+        timeout = self.cost_guard.budget(budget).timeout
+        start_time = time.monotonic()
+
+        pending = []
+        for query in queries:
+            cache_key = self._get_cache_key(query.sql, query_params=query.params)
+            if cache_key in self.cache or len(queries) == 1:
+                pending.append(self.execute_cached_query(query.sql, query_params=query.params,
+                                                         tags=query.tags, budget=budget))
+            else:
+                pending.append(self.batch_executor.submit(self.execute_cached_query, query.sql,
+                                                          query_params=query.params, tags=query.tags,
+                                                          budget=budget))
+
+        results = []
+        for query, item in zip(queries, pending):
+            if not isinstance(item, Future):
+                results.append(item)
+                continue
+            try:
+                results.append(item.result(timeout=max(0.0, timeout - (time.monotonic() - start_time))))
+            except FutureTimeoutError:
+                logger.warning(f"Batched query timed out after {timeout:g}s: {query.sql[:100]}...")
+                results.append(None)
+        return results
+
+    def _execute_live(self, query: str, cache_key: str,
+                      query_params: Optional[List[QueryParameter]] = None,
+                      tags: Optional[Iterable[str]] = None,
+                      budget: Optional[str] = None) -> Optional[List[Dict]]:
+        """Execute a user-facing miss; prefetch jobs wait while any are running."""
+        if self.prefetcher is None:
+            return self._execute_and_cache(query, cache_key, query_params=query_params, tags=tags, budget=budget)
+        with self.prefetcher.live_query():
+            return self._execute_and_cache(query, cache_key, query_params=query_params, tags=tags, budget=budget)
+
+    def _prefetch(self, query: BoundQuery, budget: Optional[str] = None) -> None:
+        """Speculatively warm the cache for a query the client is likely to send next."""
+        if self.prefetcher is None:
+            return
+
+        cache_key = self._get_cache_key(query.sql, query_params=query.params)
+        if cache_key in self.cache:
+            return
+
+        self.prefetcher.submit(cache_key, lambda: self.inflight.do(
+            cache_key,
+            lambda: self._execute_and_cache(query.sql, cache_key, query_params=query.params,
+                                            tags=query.tags, budget=budget)
+        ))
+
+    def _schedule_refresh(self, query: str, cache_key: str,
+                          query_params: Optional[List[QueryParameter]] = None,
+                          budget: Optional[str] = None) -> None:
+        """Queue a background refresh for a stale entry unless one is running."""
+        if not self.cache.mark_refreshing(cache_key):
+            return
+
+        try:
+            self.refresh_executor.submit(self._refresh_cached_query, query, cache_key, query_params, budget)
+            logger.debug(f"Scheduled background refresh for key: {cache_key[:50]}...")
+        except RuntimeError as e:
+            self.cache.mark_refresh_failed(cache_key, str(e))
+
+    def _refresh_cached_query(self, query: str, cache_key: str,
+                              query_params: Optional[List[QueryParameter]] = None,
+                              budget: Optional[str] = None) -> None:
+        """Background worker: re-run a stale query and replace its cache entry."""
+        try:
+            results, _ = self.inflight.do(
+                cache_key,
+                lambda: self._execute_and_cache(query, cache_key, check_cache=False,
+                                                query_params=query_params, budget=budget)
+            )
+            if results is None:
+                self.cache.mark_refresh_failed(cache_key, 'Query returned no results')
+        except Exception as e:
+            logger.warning(f"Background refresh failed for key {cache_key[:50]}...: {e}")
+            self.cache.mark_refresh_failed(cache_key, str(e))
+
+    def _execute_and_cache(self, query: str, cache_key: str, check_cache: bool = True,
+                           query_params: Optional[List[QueryParameter]] = None,
+                           tags: Optional[Iterable[str]] = None,
+                           budget: Optional[str] = None) -> Optional[List[Dict]]:
+        """Run the query against the database and cache the processed rows."""
+        # Another leader may have filled the cache just before this call started
+        if check_cache:
+            cached_result = self._get_cached_result(cache_key)
+            if cached_result is not None:
+                return cached_result
+
         start_time = time.time()
-        results = self.db.execute_query(query)
+        results = self._run_query(query, query_params, budget)
         execution_time = time.time() - start_time
 
+        # None means the query failed (errors are logged by the database
+        # layer); it is not cached so the next request retries
         if results is None:
-            logger.warning(f"Query returned no results: {query[:100]}...")
+            logger.warning(f"Query failed, result not cached: {query[:100]}...")
             return None
 
         # Convert results to list of dictionaries for easier handling
         processed_results = self._process_query_results(results)
 
         # Cache the results
-        self._cache_result(cache_key, processed_results)
+        self._cache_result(cache_key, processed_results, tags)
 
         logger.info(f"Query executed and cached: {len(processed_results)} records in {execution_time:.3f}s")
         return processed_results
 
+    def _run_query(self, query: str, query_params: Optional[List[QueryParameter]] = None,
+                   budget: Optional[str] = None):
+        """
+        Execute on the local replica when it can serve the query, else on BigQuery.
+        BigQuery executions are checked against the cost budget first.
+        Execution latency is recorded per source; failures count as errors.
+        """
+        if self.replica is not None and self.replica.can_serve(query):
+            start_time = time.perf_counter()
+            try:
+                results = self.replica.execute(query, query_params)
+                self.metrics.observe('replica', time.perf_counter() - start_time, query)
+                return results
+            except Exception as e:
+                logger.warning(f"Local replica query failed, falling back to BigQuery: {e}")
+
+        plan = self.cost_guard.plan(query, query_params, budget)
+
+        start_time = time.perf_counter()
+        results = self.db.execute_query(query, query_params=query_params, **self._job_options(plan))
+        self.metrics.observe('bigquery', time.perf_counter() - start_time, query)
+        if results is None:
+            self.metrics.increment('errors', query=query)
+        return results
+
+    @staticmethod
+    def _job_options(plan: ExecutionPlan) -> Dict:
+        """Database job settings for an execution plan."""
+        return {
+            'max_bytes_billed': plan.max_bytes_billed,
+            'priority': plan.priority,
+            'timeout': plan.timeout
+        }
+
+    def get_replica_status(self) -> Dict:
+        """Local replica freshness, or a disabled marker."""
+        if self.replica is None:
+            return {'enabled': False}
+        return self.replica.status()
+
     def _process_query_results(self, results) -> List[Dict]:
         """
         Process query results into standardized format.
         Applies Phase 1.1 data formatting patterns.
+
+        BigQuery results are converted column-wise through Arrow when
+        pyarrow is available; other result types fall back to row-wise
+        conversion with the column-name mapping computed once per schema.
         """
+        if pyarrow is not None and isinstance(results, pyarrow.Table):
+            return self._process_arrow_results(results)
+
+        if self.arrow_results and pyarrow is not None and hasattr(results, 'to_arrow'):
+            try:
+                return self._process_arrow_results(self.db.to_arrow(results))
+            except Exception as e:
+                logger.warning(f"Arrow result conversion failed, falling back to row-wise: {e}")
+
         processed_data = []
+        column_mapping = None
+        mapped_fields = None
 
         for row in results:
             # Handle different row types (BigQuery Row objects vs mock data)
@@ -120,17 +441,16 @@ class DataAccessService:
                 # BigQuery Row object
                 row_dict = {}
                 for key, value in row.items():
-                    formatted_key = self._standardize_column_name(key)
-                    formatted_value = self._standardize_value(value)
-                    row_dict[formatted_key] = formatted_value
+                    row_dict[standardize_column_name(key)] = self._standardize_value(value)
             elif hasattr(row, '_fields'):
-                # Named tuple (mock data)
-                row_dict = {}
-                for field in row._fields:
-                    value = getattr(row, field)
-                    formatted_key = self._standardize_column_name(field)
-                    formatted_value = self._standardize_value(value)
-                    row_dict[formatted_key] = formatted_value
+                # Named tuple (mock data); all rows share one schema
+                if mapped_fields is not row._fields:
+                    mapped_fields = row._fields
+                    column_mapping = [standardize_column_name(field) for field in row._fields]
+                row_dict = {
+                    key: self._standardize_value(value)
+                    for key, value in zip(column_mapping, row)
+                }
             else:
                 # Dictionary or other formats
                 row_dict = dict(row) if not isinstance(row, dict) else row
@@ -139,22 +459,72 @@ class DataAccessService:
 
         return processed_data
 
+    def stream_query(self, query: str, query_params: Optional[List[QueryParameter]] = None,
+                     batch_size: Optional[int] = None,
+                     plan: Optional[ExecutionPlan] = None) -> Iterator[List[Dict]]:
+        """
+        Stream a query's processed rows in batches.
+        Serves from cache when the result is already cached; otherwise the
+        query runs before this returns (raising QueryFailedError if it fails
+        or times out), and rows are then pulled from BigQuery page by page
+        and transformed lazily without being cached, so memory stays bounded
+        by the batch size. plan (from the cost guard) sets the job's byte
+        cap, priority and timeout.
+        """
+        batch_size = batch_size or self.stream_batch_size
+        cache_key = self._get_cache_key(query, query_params=query_params)
+
+        cached_result = self._get_cached_result(cache_key)
+        if cached_result is not None:
+            logger.info(f"Streaming query from cache: {len(cached_result)} records")
+            return (cached_result[start:start + batch_size]
+                    for start in range(0, len(cached_result), batch_size))
+
+        use_arrow = self.arrow_results and pyarrow is not None
+        job_options = self._job_options(plan) if plan is not None else {}
+        batches = self.db.iter_query_batches(query, query_params, batch_size, as_arrow=use_arrow,
+                                             **job_options)
+        return self._process_batches(batches)
+
+    def _process_batches(self, batches: Iterable) -> Iterator[List[Dict]]:
+        """Convert streamed result batches to processed rows as they are consumed."""
+        streamed = 0
+        for batch in batches:
+            if pyarrow is not None and isinstance(batch, pyarrow.RecordBatch):
+                rows = self._process_arrow_results(batch)
+            else:
+                rows = self._process_query_results(batch)
+            streamed += len(rows)
+            yield rows
+
+        logger.info(f"Query streamed: {streamed} records")
+
+    def _process_arrow_results(self, table) -> List[Dict]:
+        """Convert an Arrow table or record batch column-wise, then assemble rows in bulk."""
+        names = [standardize_column_name(name) for name in table.column_names]
+        columns = [
+            self._standardize_column_values(column.type, column.to_pylist())
+            for column in table.columns
+        ]
+        return [dict(zip(names, values)) for values in zip(*columns)]
+
+    def _standardize_column_values(self, arrow_type, values: List[Any]) -> List[Any]:
+        """Apply _standardize_value to a whole column, specialized by Arrow type."""
+        types = pyarrow.types
+        if types.is_integer(arrow_type) or types.is_floating(arrow_type) or types.is_null(arrow_type):
+            return values
+        if types.is_string(arrow_type) or types.is_large_string(arrow_type):
+            return [value.strip() if value is not None else None for value in values]
+        if types.is_temporal(arrow_type):
+            return [value.isoformat() if value is not None else None for value in values]
+        return [self._standardize_value(value) for value in values]
+
     def _standardize_column_name(self, column_name: str) -> str:
         """
         Standardize column names following Phase 1.1 patterns.
         Based on Column_rename.py standardization approach.
         """
-        # Convert to lowercase and replace spaces/special chars with underscores
-        standardized = column_name.lower().replace(' ', '_').replace('-', '_')
-
-        # Remove special characters
-        import re
-        standardized = re.sub(r'[^\w]', '_', standardized)
-
-        # Remove multiple underscores
-        standardized = re.sub(r'_+', '_', standardized).strip('_')
-
-        return standardized
+        return standardize_column_name(column_name)
 
     def _standardize_value(self, value: Any) -> Any:
         """
@@ -178,21 +548,37 @@ class DataAccessService:
         # Convert other types to string
         return str(value)
 
-    def get_lobby_data(self, filters: Dict = None, limit: int = 1000, offset: int = 0) -> Dict:
+    def get_lobby_data(self, filters: Dict = None, limit: int = 1000, offset: int = 0,
+                       cursor: Optional[str] = None, keyset: bool = False,
+                       budget: Optional[str] = None) -> Dict:
         """
         Get lobby data with filtering and pagination.
         Implements Phase 1.1 file selection patterns for efficient querying.
+
+        By default pages with LIMIT/OFFSET. With keyset=True (or a cursor from
+        a previous page) it seeks past the last (report_date, amount, id)
+        instead, so deep pages cost the same as the first; the response then
+        carries next_cursor for the following page, and page is None.
+
+        budget names the endpoint cost budget ('search', 'export'); queries
+        estimated over it raise QueryTooExpensiveError.
         """
         try:
+            keyset = keyset or cursor is not None
+            if keyset:
+                return self._get_lobby_data_keyset(filters, limit, cursor, budget)
+
             # Build query with filters (Phase 1.1 selection pattern)
-            query = self._build_lobby_query(filters, limit, offset)
+            query = self._build_lobby_query(filters, limit, offset, include_total=self.fused_count_query)
 
-            # Execute cached query
-            results = self.execute_cached_query(query, {
-                'filters': filters,
-                'limit': limit,
-                'offset': offset
-            })
+            # Execute cached query; without fusion the count runs alongside the page
+            if self.fused_count_query:
+                results = self.execute_cached_query(query.sql, query_params=query.params, tags=query.tags,
+                                                    budget=budget)
+                count_result = None
+            else:
+                results, count_result = self.execute_cached_queries(
+                    [query, self._build_lobby_count_query(filters)], budget)
 
             if results is None:
                 return {
@@ -203,10 +589,20 @@ class DataAccessService:
                     'filters_applied': filters or {}
                 }
 
-            # Get total count for pagination
-            count_query = self._build_lobby_count_query(filters)
-            count_result = self.execute_cached_query(count_query, {'filters': filters})
-            total_count = count_result[0]['total'] if count_result else len(results)
+            # Total comes from the fused window count when the page has rows;
+            # otherwise (or with fusion disabled) fall back to a count query
+            total_count = None
+            if self.fused_count_query:
+                results, total_count = self._split_total_count(results)
+            elif count_result:
+                total_count = count_result[0].get('total')
+
+            if total_count is None:
+                total_count = self._get_lobby_total(filters, len(results), budget)
+
+            if offset + limit < total_count:
+                self._prefetch(self._build_lobby_query(filters, limit, offset + limit,
+                                                       include_total=self.fused_count_query), budget)
 
             return {
                 'data': results,
@@ -221,116 +617,240 @@ class DataAccessService:
             logger.error(f"Error getting lobby data: {e}")
             raise
 
-    def _build_lobby_query(self, filters: Dict = None, limit: int = 1000, offset: int = 0) -> str:
+    def stream_lobby_data(self, filters: Dict = None, limit: int = 10000, offset: int = 0,
+                          batch_size: Optional[int] = None, budget: Optional[str] = None) -> Iterator[List[Dict]]:
         """
-        Build lobby data query with filters.
-        Applies Phase 1.1 data selection patterns.
+        Stream lobby data rows in batches for large pages and exports.
+        The query is built (filters validated), checked against the cost
+        budget and executed before this returns, so invalid, over-budget and
+        failed requests raise before a streamed response starts; only the
+        row batches are produced lazily.
         """
-        # Base query (mock data mode will return sample data)
-        base_query = """
-        SELECT
-            lobbyist_name,
-            client_name,
-            amount,
-            report_date,
-            activity_description,
-            payment_type
-        FROM `{project}.{dataset}.lobby_data`
-        """.strip()
-
-        where_clauses = []
-
-        if filters:
-            # Apply filters following Phase 1.1 validation patterns
-            if 'lobbyist_name' in filters:
-                where_clauses.append(f"LOWER(lobbyist_name) LIKE '%{filters['lobbyist_name'].lower()}%'")
-
-            if 'client_name' in filters:
-                where_clauses.append(f"LOWER(client_name) LIKE '%{filters['client_name'].lower()}%'")
+        query = self._build_lobby_query(filters, limit, offset)
+        plan = self.cost_guard.plan(query.sql, query.params, budget)
+        return self.stream_query(query.sql, query.params, batch_size, plan)
+
+    def _get_lobby_data_keyset(self, filters: Optional[Dict], limit: int, cursor: Optional[str],
+                               budget: Optional[str] = None) -> Dict:
+        """Cursor-paged variant of get_lobby_data."""
+        after = self._decode_cursor(cursor) if cursor else None
+
+        # Fetch one extra row to learn whether another page exists. The count
+        # query depends only on the filters, so it runs alongside the first
+        # page and is served from cache for every later page
+        query = self._build_lobby_query(filters, limit + 1, 0, after=after or ())
+        results, count_result = self.execute_cached_queries([query, self._build_lobby_count_query(filters)], budget)
+        results = results or []
+
+        has_more = len(results) > limit
+        results = results[:limit]
+        next_cursor = self._encode_cursor(results[-1]) if has_more else None
+        # id is only selected to break keyset ties; rows match offset mode without it
+        results = [{key: value for key, value in row.items() if key != 'id'} for row in results]
+        total_count = count_result[0].get('total', len(results)) if count_result else len(results)
+
+        if has_more:
+            # Built from the decoded cursor so it matches the client's next request exactly
+            self._prefetch(self._build_lobby_query(filters, limit + 1, 0, after=self._decode_cursor(next_cursor)),
+                           budget)
 
-            if 'amount_min' in filters:
-                where_clauses.append(f"amount >= {filters['amount_min']}")
+        return {
+            'data': results,
+            'total': total_count,
+            'page': None,  # position is given by the cursor, not a page number
+            'per_page': limit,
+            'next_cursor': next_cursor,
+            'filters_applied': filters or {},
+            'cache_info': self._get_cache_stats()
+        }
 
-            if 'amount_max' in filters:
-                where_clauses.append(f"amount <= {filters['amount_max']}")
+    def _get_lobby_total(self, filters: Optional[Dict], default: int, budget: Optional[str] = None) -> int:
+        """Run (or serve from cache) the count query for a filter set."""
+        count_query = self._build_lobby_count_query(filters)
+        count_result = self.execute_cached_query(count_query.sql, query_params=count_query.params,
+                                                 tags=count_query.tags, budget=budget)
+        return count_result[0].get('total', default) if count_result else default
+
+    def _encode_cursor(self, row: Dict) -> str:
+        """Opaque continuation token for the position after row."""
+        position = [row.get('report_date'), row.get('amount'), row.get('id')]
+        payload = json.dumps(position, default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def _decode_cursor(self, cursor: str):
+        """Decode a continuation token into (report_date, amount, id)."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            report_date, amount, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        except Exception:
+            raise ValueError('Invalid pagination cursor')
 
-            if 'date_from' in filters:
-                where_clauses.append(f"report_date >= '{filters['date_from']}'")
+        if not isinstance(amount, (int, float)) or isinstance(amount, bool):
+            raise ValueError('Invalid pagination cursor')
+        return str(report_date), amount, row_id
 
-            if 'date_to' in filters:
-                where_clauses.append(f"report_date <= '{filters['date_to']}'")
+    def _split_total_count(self, results: List[Dict]):
+        """
+        Strip the fused total_count column from page rows.
+        Returns (rows, total) where total is None if the column is absent.
+        """
+        if not results or 'total_count' not in results[0]:
+            return results, None
 
-        # Add WHERE clause if filters exist
-        if where_clauses:
-            base_query += " WHERE " + " AND ".join(where_clauses)
+        total_count = results[0]['total_count']
+        rows = [{key: value for key, value in row.items() if key != 'total_count'} for row in results]
+        return rows, total_count
 
-        # Add ordering and pagination
-        base_query += " ORDER BY report_date DESC, amount DESC"
-        base_query += f" LIMIT {limit} OFFSET {offset}"
+    def _build_lobby_query(self, filters: Dict = None, limit: int = 1000, offset: int = 0,
+                           include_total: bool = False, after: Optional[tuple] = None) -> BoundQuery:
+        """
+        Build lobby data query with filters.
+        Applies Phase 1.1 data selection patterns.
 
-        return base_query
+        Returns a fixed SQL template for the filter shape plus bound
+        parameters. With include_total, each row also carries total_count,
+        the number of rows matching the filters (computed before LIMIT). With
+        after=(report_date, amount, id) the query seeks past that position
+        instead of using OFFSET; pass an empty tuple for the first keyset page.
+        """
+        return self.query_builder.build_page(filters, limit, offset, include_total, after)
 
-    def _build_lobby_count_query(self, filters: Dict = None) -> str:
+    def _build_lobby_count_query(self, filters: Dict = None) -> BoundQuery:
         """Build count query for pagination."""
-        base_query = "SELECT COUNT(*) as total FROM `{project}.{dataset}.lobby_data`"
-
-        where_clauses = []
-        if filters:
-            if 'lobbyist_name' in filters:
-                where_clauses.append(f"LOWER(lobbyist_name) LIKE '%{filters['lobbyist_name'].lower()}%'")
-            if 'client_name' in filters:
-                where_clauses.append(f"LOWER(client_name) LIKE '%{filters['client_name'].lower()}%'")
-            if 'amount_min' in filters:
-                where_clauses.append(f"amount >= {filters['amount_min']}")
-            if 'amount_max' in filters:
-                where_clauses.append(f"amount <= {filters['amount_max']}")
-            if 'date_from' in filters:
-                where_clauses.append(f"report_date >= '{filters['date_from']}'")
-            if 'date_to' in filters:
-                where_clauses.append(f"report_date <= '{filters['date_to']}'")
-
-        if where_clauses:
-            base_query += " WHERE " + " AND ".join(where_clauses)
-
-        return base_query
+        return self.query_builder.build_count(filters)
 
     def get_cache_stats(self) -> Dict:
-        """Get cache performance statistics."""
-        return self._get_cache_stats()
+        """Get cache performance statistics, including the shared cache backend's."""
+        return {**self._get_cache_stats(), 'shared_cache': self._get_shared_cache_stats()}
+
+    def get_query_metrics(self) -> Dict:
+        """Counters, latency histograms and per-query-shape breakdowns."""
+        return self.metrics.snapshot()
+
+    def get_metrics_text(self) -> str:
+        """All cache and query metrics in the Prometheus text format."""
+        engine_stats = self.cache.stats()
+        inflight_stats = self.inflight.stats()
+        return self.metrics.render_prometheus(
+            gauges={
+                'cache_entries': engine_stats['entries'],
+                'cache_size_bytes': engine_stats['size_bytes'],
+                'cache_logical_bytes': engine_stats['logical_bytes'],
+                'cache_compact_entries': engine_stats['compact_entries'],
+                'cache_max_bytes': engine_stats['max_bytes'],
+                'cache_refreshing_entries': engine_stats['refreshing'],
+                'queries_in_flight': inflight_stats['in_flight']
+            },
+            counters={
+                'cache_evictions_total': engine_stats['evictions'],
+                'cache_expirations_total': engine_stats['expirations'],
+                'cache_decode_seconds_total': engine_stats['decode_seconds']
+            }
+        )
+
+    def get_cache_entry_states(self, limit: int = 100) -> List[Dict]:
+        """Per-entry freshness and background refresh state."""
+        return self.cache.entry_states(limit)
 
     def _get_cache_stats(self) -> Dict:
-        """Internal method to get cache statistics."""
-        total_entries = len(self.cache)
-        total_hits = sum(entry.get('hits', 0) for entry in self.cache.values())
-
-        # Calculate cache effectiveness
-        if total_entries > 0:
-            avg_hits = total_hits / total_entries
-            hit_rate = min(100, (total_hits / max(1, total_hits + total_entries)) * 100)
-        else:
-            avg_hits = 0
-            hit_rate = 0
+        """
+        Internal method to get cache statistics. Embedded in every search
+        response, so it only reads in-process counters; shared backend
+        statistics (a store round trip) are left to get_cache_stats.
+        """
+        engine_stats = self.cache.stats()
+        inflight_stats = self.inflight.stats()
+        counters = self.metrics.snapshot()['counters']
+        total_entries = engine_stats['entries']
+
+        # Hit rate from true lookup counters; hits per query covers live entries only
+        avg_hits = engine_stats['hits'] / total_entries if total_entries > 0 else 0
 
         return {
             'total_cached_queries': total_entries,
-            'total_cache_hits': total_hits,
+            'cache_tags': engine_stats['tags'],
+            'total_cache_hits': counters['hits'],
+            'total_cache_misses': counters['misses'],
+            'query_errors': counters['errors'],
             'average_hits_per_query': round(avg_hits, 2),
-            'cache_hit_rate_percent': round(hit_rate, 2),
-            'cache_ttl_seconds': self.cache_ttl
+            'cache_hit_rate_percent': round(self.metrics.hit_rate(), 2),
+            'cache_ttl_seconds': self.cache_ttl,
+            'cache_hard_ttl_seconds': self.cache_hard_ttl,
+            'stale_while_revalidate': self.cache_hard_ttl > self.cache_ttl,
+            'stale_hits': engine_stats['stale_hits'],
+            'negative_cache_ttl_seconds': self.negative_cache_ttl if self.negative_cache_enabled else None,
+            'negative_cache_hits': counters['negative_hits'],
+            'refreshing_entries': engine_stats['refreshing'],
+            'cache_size_bytes': engine_stats['size_bytes'],
+            'cache_logical_bytes': engine_stats['logical_bytes'],
+            'cache_compression': {
+                'enabled': self.cache.compress,
+                'compact_entries': engine_stats['compact_entries'],
+                'ratio': round(engine_stats['logical_bytes'] / engine_stats['size_bytes'], 2)
+                if engine_stats['size_bytes'] else None,
+                'decode_seconds': engine_stats['decode_seconds']
+            },
+            'cache_max_bytes': engine_stats['max_bytes'],
+            'cache_max_entries': engine_stats['max_entries'],
+            'cache_shards': engine_stats['shards'],
+            'evictions': engine_stats['evictions'],
+            'expirations': engine_stats['expirations'],
+            'in_flight_queries': inflight_stats['in_flight'],
+            'coalesced_requests': inflight_stats['coalesced'],
+            'query_templates': self.query_builder.template_cache_info(),
+            'prefetch': self.prefetcher.stats() if self.prefetcher is not None else {'enabled': False},
+            'cost_guard': self.cost_guard.stats()
         }
 
-    def clear_cache(self, pattern: str = None) -> Dict:
-        """Clear cache entries, optionally matching a pattern."""
-        if pattern is None:
-            entries_cleared = len(self.cache)
-            self.cache.clear()
+    def _get_shared_cache_stats(self) -> Dict:
+        """Statistics for the shared cache backend, if one is configured."""
+        if self.shared_cache is None:
+            return {'backend': 'none'}
+
+        try:
+            return self.shared_cache.stats()
+        except Exception as e:
+            logger.warning(f"Shared cache stats unavailable: {e}")
+            return {'backend': self.shared_cache.name, 'error': str(e)}
+
+    def clear_cache(self, pattern: str = None, tags: Optional[List[str]] = None, match: str = 'any') -> Dict:
+        """
+        Clear cache entries, optionally matching a pattern or tags.
+
+        With tags, only entries indexed under any (match='any') or all
+        (match='all') of them are removed, e.g. ['year:2024', 'year:open']
+        after reloading 2024 lobby_data. This touches only the tagged
+        entries rather than flushing the cache.
+        """
+        if tags:
+            if match not in ('any', 'all'):
+                raise ValueError("match must be 'any' or 'all'")
+
+            removed_keys = self.cache.invalidate_tags(tags, match)
+            entries_cleared = len(removed_keys)
+            if self.shared_cache is not None:
+                try:
+                    entries_cleared = max(entries_cleared, self.shared_cache.invalidate_tags(tags, match))
+                except Exception as e:
+                    logger.warning(f"Shared cache tag invalidation failed: {e}")
+            logger.info(f"Cleared {entries_cleared} cache entries tagged {match} of: {tags}")
+        elif pattern is None:
+            entries_cleared = self.cache.clear()
+            if self.shared_cache is not None:
+                entries_cleared = max(entries_cleared, self.shared_cache.clear())
             logger.info(f"Cleared all cache entries: {entries_cleared}")
         else:
+            keys_to_remove = {key for key in self.cache.keys() if pattern in key}
+            if self.shared_cache is not None:
+                keys_to_remove.update(key for key in self.shared_cache.keys() if pattern in key)
+
             entries_cleared = 0
-            keys_to_remove = [key for key in self.cache.keys() if pattern in key]
             for key in keys_to_remove:
-                del self.cache[key]
-                entries_cleared += 1
+                removed = self.cache.delete(key)
+                if self.shared_cache is not None:
+                    removed = self.shared_cache.delete(key) or removed
+                if removed:
+                    entries_cleared += 1
             logger.info(f"Cleared {entries_cleared} cache entries matching pattern: {pattern}")
 
         return {
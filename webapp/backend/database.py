@@ -4,27 +4,104 @@ Database Connection Module for CA Lobby API
 Leverages existing Phase 1.1 BigQuery connection patterns and infrastructure.
 Provides connection pooling, error handling, and query optimization for API layer.
 
+Queries run on a dedicated job executor: submit_query returns a future
+(execute_query_async an awaitable), and retry backoff is scheduled with a
+timer instead of sleeping the calling thread. execute_query waits on that
+future with a timeout; execute_many submits several queries at once and
+gathers them with per-query timeouts.
+
+Results of at least BQSTORAGE_MIN_ROWS rows are downloaded as Arrow record
+batches through the BigQuery Storage Read API (parallel streams) when
+google-cloud-bigquery-storage is installed, falling back to the REST API.
+
+The BigQuery client libraries are imported and the client is built lazily
+on first use; warm_up() does that on a background thread at boot so cold
+starts serve immediately. Connectivity is validated by a cheap dataset
+metadata probe whose result is cached for BIGQUERY_PROBE_TTL_SECONDS.
+
+Failures are classified (see resilience.py): transient and rate-limit
+errors are retried with decorrelated-jitter backoff, quota and client
+errors fail at once. A failure-rate circuit breaker fails queries fast
+while BigQuery is unhealthy and reports 'circuit_open' to health checks so
+load balancers shed traffic.
+
+In mock mode (USE_MOCK_DATA=true) queries run against the embedded DuckDB
+backend in mock_backend.py on the same job executor, with simulated
+latency; without duckdb they return canned sample rows.
+
 Based on:
 - Bigquery_connection.py patterns from Phase 1.1
 - Existing credential management from .env
 - Phase 1.1 error handling and logging patterns
 """
 
-from google.cloud import bigquery
-from google.oauth2 import service_account
-from google.api_core.exceptions import GoogleAPICallError, NotFound, Forbidden
+from google.api_core.exceptions import NotFound, Forbidden
 from dotenv import load_dotenv
+import asyncio
+import json
 import os
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from functools import lru_cache
 from datetime import datetime
 import time
 
+from job_stats import create_job_stats_recorder
+from mock_backend import create_local_engine
+from resilience import (BREAKER_ERRORS, RETRYABLE_ERRORS, CircuitBreaker, CircuitOpenError,
+                        DecorrelatedJitterBackoff, classify_error)
+
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# The client libraries dominate cold-start import time, so they are loaded
+# on first use by _load_bigquery()
+bigquery = None
+service_account = None
+
+
+def _load_bigquery():
+    """Import the BigQuery client modules once and return google.cloud.bigquery."""
+    global bigquery, service_account
+    if bigquery is None:
+        from google.oauth2 import service_account as service_account_module
+        from google.cloud import bigquery as bigquery_module
+        service_account = service_account_module
+        bigquery = bigquery_module
+    return bigquery
+
+
+class QueryFuture(Future):
+    """Future for a submitted query; tracks the running BigQuery job so it can be abandoned."""
+
+    def __init__(self):
+        super().__init__()
+        self.query_job = None
+        self.attempts = 0
+        self.abandoned = False
+        self.job_options = {}
+        self.retry_delay = None
+
+    def abandon(self):
+        """
+        Stop retrying and cancel the BigQuery job. A job that has not been
+        created yet is skipped, or cancelled as soon as it is created.
+        """
+        self.abandoned = True
+        if self.query_job is not None:
+            try:
+                self.query_job.cancel()
+            except Exception as e:
+                logger.debug(f"Could not cancel BigQuery job: {e}")
+
+
+class QueryFailedError(RuntimeError):
+    """Raised when a query whose rows are needed up front fails or times out."""
+
+
 class DatabaseConnection:
     """
     Database connection manager using Phase 1.1 established patterns.
@@ -33,19 +110,84 @@ class DatabaseConnection:
 
     def __init__(self):
         self.client = None
-        self.project_id = None
+        self.credentials = None
         self.dataset_id = os.getenv('BIGQUERY_DATASET', 'ca_lobby')
         self.use_mock_data = os.getenv('USE_MOCK_DATA', 'false').lower() == 'true'
+        # Known before the client exists so queries can be built during warm-up
+        self.project_id = None if self.use_mock_data else self._configured_project_id()
+        self._init_lock = threading.Lock()
+        self._warmup_thread = None
+        self.probe_ttl = float(os.getenv('BIGQUERY_PROBE_TTL_SECONDS', 300))
+        self._probe_result = None
+        self._probe_checked_at = None
+        self._probe_error = None
+        self.startup_timings = {}
+        self.query_timeout = float(os.getenv('BIGQUERY_QUERY_TIMEOUT_SECONDS', 300))
+        # Dry runs gate every uncached query, so they must not hang
+        self.dry_run_timeout = float(os.getenv('BIGQUERY_DRY_RUN_TIMEOUT_SECONDS', 10))
+        self.retry_base_delay = float(os.getenv('BIGQUERY_RETRY_BASE_DELAY_SECONDS', 1))
+        self.retry_backoff = DecorrelatedJitterBackoff(
+            base=self.retry_base_delay,
+            cap=float(os.getenv('BIGQUERY_RETRY_MAX_DELAY_SECONDS', 30))
+        )
+        self.breaker = CircuitBreaker(
+            failure_ratio=float(os.getenv('BREAKER_FAILURE_RATIO', 0.5)),
+            min_calls=int(os.getenv('BREAKER_MIN_CALLS', 10)),
+            window_seconds=float(os.getenv('BREAKER_WINDOW_SECONDS', 60)),
+            open_seconds=float(os.getenv('BREAKER_OPEN_SECONDS', 30)),
+            half_open_calls=int(os.getenv('BREAKER_HALF_OPEN_CALLS', 1))
+        )
+        # Queries wait for BigQuery here, not on request threads
+        self.job_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('BIGQUERY_JOB_WORKERS', 8)),
+            thread_name_prefix='bigquery-job'
+        )
+        self.bqstorage_enabled = os.getenv('BQSTORAGE_ENABLED', 'true').lower() == 'true'
+        self.bqstorage_min_rows = int(os.getenv('BQSTORAGE_MIN_ROWS', 5000))
+        self._bqstorage_client = None
+        self._bqstorage_unavailable = False
+        self._bqstorage_lock = threading.Lock()
+        self.download_counts = {'storage_api': 0, 'rest': 0, 'storage_api_fallbacks': 0}
+        # Bytes, slots, cache hit and stage timings of every finished job
+        self.job_stats = create_job_stats_recorder()
+        # Mock mode SQL engine, built on the first mock query
+        self._local_engine = None
+        self._local_engine_loaded = False
+
+    def _configured_project_id(self):
+        """Project from BIGQUERY_PROJECT_ID or the service account file, without a client."""
+        project_id = os.getenv('BIGQUERY_PROJECT_ID')
+        if project_id:
+            return project_id
+
+        credentials_path = os.getenv('CREDENTIALS_LOCATION')
+        if not credentials_path or not os.path.exists(credentials_path):
+            return None
+        try:
+            with open(credentials_path) as credentials_file:
+                return json.load(credentials_file).get('project_id')
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not read project id from credentials: {e}")
+            return None
 
     def initialize_connection(self):
         """
         Initialize BigQuery connection using Phase 1.1 patterns.
         Returns client instance or None if connection fails.
+        Only builds the client; connectivity is checked separately by probe().
         """
         if self.use_mock_data:
             logger.info("🔧 Using mock data mode - database connection skipped")
             return None
 
+        with self._init_lock:
+            # Another thread (e.g. the warm-up) may have finished first
+            if self.client is not None:
+                return self.client
+            return self._create_client()
+
+    def _create_client(self):
+        start_time = time.perf_counter()
         try:
             # Get credentials path from environment (Phase 1.1 pattern)
             credentials_path = os.getenv('CREDENTIALS_LOCATION')
@@ -58,16 +200,16 @@ class DatabaseConnection:
                 return None
 
             # Load credentials using Phase 1.1 pattern
+            bigquery_module = _load_bigquery()
             credentials = service_account.Credentials.from_service_account_file(credentials_path)
+            self.credentials = credentials
             self.project_id = credentials.project_id
 
-            # Initialize BigQuery client
-            self.client = bigquery.Client(credentials=credentials, project=self.project_id)
-
-            # Test connection by listing datasets (Phase 1.1 validation pattern)
-            datasets = list(self.client.list_datasets())
-            logger.info(f"✅ Connected to BigQuery project: {self.project_id}")
-            logger.info(f"Available datasets: {[dataset.dataset_id for dataset in datasets]}")
+            # Initialize BigQuery client (no network calls until first use)
+            self.client = bigquery_module.Client(credentials=credentials, project=self.project_id)
+            self.startup_timings['client_init_seconds'] = round(time.perf_counter() - start_time, 3)
+            logger.info(f"✅ BigQuery client created for project: {self.project_id} "
+                        f"in {self.startup_timings['client_init_seconds']}s")
 
             return self.client
 
@@ -81,6 +223,57 @@ class DatabaseConnection:
             logger.error(f"❌ Database connection failed: {e}")
             return None
 
+    def warm_up(self, started_at=None):
+        """
+        Build the client and run the probe on a background thread (idempotent).
+        started_at (a time.perf_counter() value, e.g. taken at app import)
+        is used to report import-to-ready time.
+        """
+        if self.use_mock_data:
+            return None
+        if self._warmup_thread is not None:
+            return self._warmup_thread
+
+        def _warm():
+            ready = self.get_client() is not None and self.probe()
+            self.startup_timings['warmup_succeeded'] = bool(ready)
+            if started_at is not None:
+                self.startup_timings['import_to_ready_seconds'] = round(time.perf_counter() - started_at, 3)
+                logger.info(f"✅ BigQuery ready {self.startup_timings['import_to_ready_seconds']}s after import")
+
+        self._warmup_thread = threading.Thread(target=_warm, name='bigquery-warmup', daemon=True)
+        self._warmup_thread.start()
+        return self._warmup_thread
+
+    def probe(self, force=False):
+        """
+        Cheap connectivity check: one metadata read of the configured dataset.
+        The outcome is cached for probe_ttl seconds. Returns True if reachable.
+        """
+        now = time.monotonic()
+        if (not force and self._probe_checked_at is not None
+                and now - self._probe_checked_at < self.probe_ttl):
+            return self._probe_result
+
+        client = self.get_client()
+        if client is None:
+            self._probe_result, self._probe_error = False, 'No client connection available'
+        else:
+            start_time = time.perf_counter()
+            try:
+                client.get_dataset(f"{self.project_id}.{self.dataset_id}")
+                self._probe_result, self._probe_error = True, None
+                self.startup_timings.setdefault('first_probe_seconds', round(time.perf_counter() - start_time, 3))
+            except NotFound:
+                self._probe_result, self._probe_error = False, f"Dataset {self.dataset_id} not found"
+            except Exception as e:
+                self._probe_result, self._probe_error = False, str(e)
+
+        if not self._probe_result:
+            logger.warning(f"⚠️ BigQuery probe failed: {self._probe_error}")
+        self._probe_checked_at = now
+        return self._probe_result
+
     def get_client(self):
         """
         Get or create database client with connection retry logic.
@@ -102,7 +295,8 @@ class DatabaseConnection:
         """
         return self.execute_query(query_string)
 
-    def execute_query(self, query_string, retry_count=3):
+    def execute_query(self, query_string, retry_count=3, query_params=None, page_size=None,
+                      max_bytes_billed=None, priority=None, timeout=None):
         """
         Execute BigQuery with retry logic and error handling.
         Applies Phase 1.1 error recovery patterns.
@@ -110,49 +304,357 @@ class DatabaseConnection:
         Args:
             query_string (str): SQL query to execute
             retry_count (int): Number of retry attempts
+            query_params (list): Optional (name, type, value) parameters bound
+                to @name placeholders in the query
+            page_size (int): Optional rows per result page fetched from the API
+            max_bytes_billed (int): Optional cap enforced by BigQuery
+            priority (str): 'interactive' (default) or 'batch'
+            timeout (float): Seconds to wait; defaults to BIGQUERY_QUERY_TIMEOUT_SECONDS
 
         Returns:
             query results or None if failed
         """
+        timeout = timeout or self.query_timeout
+        future = self.submit_query(query_string, query_params=query_params, page_size=page_size,
+                                   retry_count=retry_count, max_bytes_billed=max_bytes_billed,
+                                   priority=priority)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            logger.error(f"❌ Query timed out after {timeout:g}s")
+            future.abandon()
+            return None
+        except Exception:
+            # Already logged by the job executor
+            return None
+
+    def submit_query(self, query_string, query_params=None, page_size=None, retry_count=3,
+                     max_bytes_billed=None, priority=None):
+        """
+        Submit a query to the job executor without blocking.
+        Returns a QueryFuture resolving to the results, or raising the final
+        error once retries are exhausted (CircuitOpenError while the circuit
+        breaker is open).
+        """
+        future = QueryFuture()
+        future.job_options.update(max_bytes_billed=max_bytes_billed, priority=priority)
+        future.set_running_or_notify_cancel()
+
         if self.use_mock_data:
-            logger.info("🔧 Mock data mode - returning sample data")
-            return self._get_mock_data(query_string)
+            engine = self.get_local_engine()
+            if engine is None:
+                logger.info("🔧 Mock data mode - returning sample data")
+                future.set_result(self._get_mock_data(query_string))
+                return future
+            try:
+                self.job_executor.submit(self._run_local_query, future, engine, query_string,
+                                         query_params, page_size)
+            except RuntimeError as e:  # Executor shut down
+                future.set_exception(e)
+            return future
 
         client = self.get_client()
         if client is None:
             logger.error("❌ No database client available")
-            return None
+            future.set_exception(RuntimeError('No database client available'))
+            return future
+
+        if not self.breaker.allow():
+            logger.warning("⚠️ Circuit breaker open - failing query fast")
+            future.set_exception(CircuitOpenError('BigQuery circuit breaker is open'))
+            return future
+
+        self._submit_attempt(future, client, query_string, query_params, page_size, 0, retry_count)
+        return future
 
-        for attempt in range(retry_count):
+    def execute_many(self, queries, timeout=None, retry_count=3):
+        """
+        Run independent queries concurrently and gather their results.
+        Latency is that of the slowest query rather than the sum of all.
+
+        Args:
+            queries (list): SQL strings, or dicts of execute_query keyword
+                arguments with a required 'query_string' and optional
+                per-query 'timeout'
+            timeout (float): Default per-query timeout, measured from submission
+
+        Returns:
+            list of results in input order; None for each query that failed
+            or timed out
+        """
+        start_time = time.monotonic()
+        submitted = []
+        for query in queries:
+            options = {'query_string': query} if isinstance(query, str) else dict(query)
+            query_timeout = options.pop('timeout', None) or timeout or self.query_timeout
+            options.setdefault('retry_count', retry_count)
+            submitted.append((self.submit_query(**options), query_timeout))
+
+        results = []
+        for index, (future, query_timeout) in enumerate(submitted):
+            remaining = max(0.0, query_timeout - (time.monotonic() - start_time))
             try:
-                # Configure query job with optimization settings
-                job_config = bigquery.QueryJobConfig()
-                job_config.use_query_cache = True
-                job_config.use_legacy_sql = False
+                results.append(future.result(timeout=remaining))
+            except FutureTimeoutError:
+                logger.error(f"❌ Batch query {index + 1}/{len(submitted)} timed out after {query_timeout:g}s")
+                future.abandon()
+                results.append(None)
+            except Exception:
+                # Already logged by the job executor
+                results.append(None)
+
+        logger.info(f"✅ Batch of {len(submitted)} queries finished in {time.monotonic() - start_time:.2f}s")
+        return results
+
+    async def execute_query_async(self, query_string, query_params=None, page_size=None, retry_count=3):
+        """Awaitable variant of submit_query for asyncio callers."""
+        future = self.submit_query(query_string, query_params=query_params,
+                                   page_size=page_size, retry_count=retry_count)
+        return await asyncio.wrap_future(future)
+
+    def _submit_attempt(self, future, client, query_string, query_params, page_size, attempt, retry_count):
+        if future.abandoned:
+            future.set_exception(RuntimeError('Query abandoned'))
+            return
+        if attempt > 0 and self.breaker.state == CircuitBreaker.OPEN:
+            future.set_exception(CircuitOpenError('BigQuery circuit breaker opened before retry'))
+            return
+        try:
+            self.job_executor.submit(self._run_attempt, future, client, query_string, query_params,
+                                     page_size, attempt, retry_count)
+        except RuntimeError as e:  # Executor shut down
+            future.set_exception(e)
+
+    def _run_attempt(self, future, client, query_string, query_params, page_size, attempt, retry_count):
+        """Job executor: run one attempt, then resolve the future or schedule a retry."""
+        # Timed out while queued behind other jobs; never start it
+        if future.abandoned:
+            future.set_exception(RuntimeError('Query abandoned'))
+            return
+        future.attempts = attempt + 1
+        try:
+            # Configure query job with optimization settings
+            job_config = _load_bigquery().QueryJobConfig()
+            job_config.use_query_cache = True
+            job_config.use_legacy_sql = False
+            if query_params:
+                job_config.query_parameters = self._build_query_parameters(query_params)
+            job_options = future.job_options
+            if job_options.get('max_bytes_billed'):
+                job_config.maximum_bytes_billed = int(job_options['max_bytes_billed'])
+            if job_options.get('priority') == 'batch':
+                job_config.priority = _load_bigquery().QueryPriority.BATCH
+
+            logger.info(f"🔍 Executing query (attempt {attempt + 1}/{retry_count})")
+            logger.debug(f"Query: {query_string[:200]}...")
+
+            start_time = time.time()
+            query_job = client.query(query_string, job_config=job_config)
+            future.query_job = query_job
+            # Abandoned while the job was being created: abandon() may not have seen it
+            if future.abandoned:
+                query_job.cancel()
+                future.set_exception(RuntimeError('Query abandoned'))
+                return
+            results = query_job.result(page_size=page_size)
+            execution_time = time.time() - start_time
+
+            logger.info(f"✅ Query executed successfully in {execution_time:.2f}s")
+            self.breaker.record_success()
+            self._record_job_stats(query_string, query_job, execution_time, job_options.get('priority'))
+            future.set_result(results)
+
+        except Exception as e:
+            kind = classify_error(e)
+            if kind in BREAKER_ERRORS:
+                self.breaker.record_failure()
+            if kind not in RETRYABLE_ERRORS:
+                logger.error(f"❌ Query failed ({kind} error, not retried): {e}")
+                future.set_exception(e)
+                return
+            if attempt == retry_count - 1 or future.abandoned:
+                logger.error(f"❌ Query failed after {attempt + 1} attempts: {e}")
+                future.set_exception(e)
+                return
+
+            # Decorrelated-jitter backoff on a timer; no thread sleeps while waiting
+            future.retry_delay = self.retry_backoff.next_delay(future.retry_delay)
+            logger.warning(f"⚠️ BigQuery {kind} error (attempt {attempt + 1}), "
+                           f"retrying in {future.retry_delay:.2f}s: {e}")
+            retry = threading.Timer(future.retry_delay, self._submit_attempt,
+                                    args=(future, client, query_string, query_params, page_size,
+                                          attempt + 1, retry_count))
+            retry.daemon = True
+            retry.start()
+
+    def get_local_engine(self):
+        """Mock mode SQL engine, created on first use; None means canned sample rows."""
+        if not self._local_engine_loaded:
+            with self._init_lock:
+                if not self._local_engine_loaded:
+                    self._local_engine = create_local_engine()
+                    self._local_engine_loaded = True
+        return self._local_engine
+
+    def _run_local_query(self, future, engine, query_string, query_params, page_size):
+        """Job executor: run a query on the mock backend and resolve the future."""
+        future.attempts = 1
+        try:
+            start_time = time.time()
+            results = engine.execute(query_string, query_params=query_params, page_size=page_size)
+            logger.info(f"🔧 Mock query returned {results.total_rows} rows in {time.time() - start_time:.3f}s")
+            future.set_result(results)
+        except Exception as e:
+            logger.error(f"❌ Mock query execution error: {e}")
+            future.set_exception(e)
+
+    def _record_job_stats(self, query_string, query_job, execution_time, priority):
+        """Record job statistics; never fails the query."""
+        try:
+            entry = self.job_stats.record(query_string, query_job, execution_time, priority)
+            logger.info(f"📊 Job {entry['job_id']}: {entry['bytes_processed']} bytes processed, "
+                        f"{entry['bytes_billed']} billed, {entry['slot_ms']} slot ms, cache hit: {entry['cache_hit']}")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not record job statistics: {e}")
+
+    def iter_query_batches(self, query_string, query_params=None, batch_size=1000, as_arrow=False,
+                           **job_options):
+        """
+        Execute a query and return an iterator over its results in batches
+        instead of all at once. The query runs before this returns, so a
+        failure or timeout raises QueryFailedError here rather than ending
+        the iteration early; only fetching the pages is lazy.
+
+        Yields lists of rows, or Arrow record batches when as_arrow is set and
+        the result supports it. Only one batch is held in memory at a time.
+        job_options (max_bytes_billed, priority, timeout) go to execute_query.
+        """
+        results = self.execute_query(query_string, query_params=query_params, page_size=batch_size,
+                                     **job_options)
+        if results is None:
+            raise QueryFailedError('Query failed or timed out')
+        return self._iter_result_batches(results, batch_size, as_arrow)
+
+    def _iter_result_batches(self, results, batch_size, as_arrow):
+        """Yield an executed query's results in batches; see iter_query_batches."""
+        if as_arrow and hasattr(results, 'to_arrow_iterable'):
+            yield from self._iter_arrow_batches(results)
+            return
+
+        if hasattr(results, 'pages'):
+            for page in results.pages:
+                yield list(page)
+            return
+
+        # Mock data and other plain iterables
+        batch = []
+        for row in results:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def dry_run(self, query_string, query_params=None):
+        """
+        Estimate bytes processed by a query without running it.
+        Returns None in mock mode or if the dry run fails or exceeds
+        BIGQUERY_DRY_RUN_TIMEOUT_SECONDS.
+        """
+        if self.use_mock_data:
+            return None
+
+        client = self.get_client()
+        if client is None:
+            return None
 
-                logger.info(f"🔍 Executing query (attempt {attempt + 1}/{retry_count})")
-                logger.debug(f"Query: {query_string[:200]}...")
+        try:
+            job_config = _load_bigquery().QueryJobConfig(dry_run=True, use_query_cache=False)
+            if query_params:
+                job_config.query_parameters = self._build_query_parameters(query_params)
+            query_job = client.query(query_string, job_config=job_config, timeout=self.dry_run_timeout)
+            logger.debug(f"Dry run estimate: {query_job.total_bytes_processed} bytes")
+            return query_job.total_bytes_processed
+        except Exception as e:
+            logger.warning(f"⚠️ Dry run failed, no cost estimate: {e}")
+            return None
 
-                start_time = time.time()
-                query_job = client.query(query_string, job_config=job_config)
-                results = query_job.result()
-                execution_time = time.time() - start_time
+    def get_bqstorage_client(self):
+        """
+        Shared BigQuery Storage Read API client, created on first use.
+        Returns None in mock mode, or when disabled, not installed, or not creatable.
+        """
+        if self.use_mock_data or not self.bqstorage_enabled or self._bqstorage_unavailable:
+            return None
 
-                logger.info(f"✅ Query executed successfully in {execution_time:.2f}s")
-                return results
+        with self._bqstorage_lock:
+            if self._bqstorage_client is None and not self._bqstorage_unavailable:
+                try:
+                    # Optional dependency, imported on first large download
+                    from google.cloud import bigquery_storage
+                    self._bqstorage_client = bigquery_storage.BigQueryReadClient(credentials=self.credentials)
+                    logger.info("✅ BigQuery Storage Read API client ready")
+                except Exception as e:
+                    logger.warning(f"⚠️ Storage Read API unavailable, using REST downloads: {e}")
+                    self._bqstorage_unavailable = True
+            return self._bqstorage_client
+
+    def _use_storage_api(self, results):
+        """True if a result is large enough for the Storage Read API and it is available."""
+        total_rows = getattr(results, 'total_rows', None)
+        return (total_rows is not None and total_rows >= self.bqstorage_min_rows
+                and self.get_bqstorage_client() is not None)
+
+    def to_arrow(self, results):
+        """
+        Download a complete query result as an Arrow table.
+        Large results use the Storage Read API; small ones, or any failure
+        there, use the REST API.
+        """
+        if self._use_storage_api(results):
+            try:
+                table = results.to_arrow(bqstorage_client=self._bqstorage_client)
+                self.download_counts['storage_api'] += 1
+                logger.info(f"📦 Downloaded {table.num_rows} rows via Storage Read API")
+                return table
+            except Exception as e:
+                self.download_counts['storage_api_fallbacks'] += 1
+                logger.warning(f"⚠️ Storage Read API download failed, falling back to REST: {e}")
 
-            except GoogleAPICallError as e:
-                logger.warning(f"⚠️ BigQuery API error (attempt {attempt + 1}): {e}")
-                if attempt == retry_count - 1:
-                    logger.error(f"❌ Query failed after {retry_count} attempts: {e}")
-                    return None
-                time.sleep(2 ** attempt)  # Exponential backoff
+        self.download_counts['rest'] += 1
+        return results.to_arrow(create_bqstorage_client=False)
 
+    def _iter_arrow_batches(self, results):
+        """
+        Yield Arrow record batches, via the Storage Read API for large results.
+        Falls back to REST only if the Storage API fails before the first
+        batch; a failure mid-stream is raised rather than re-sending rows.
+        """
+        if self._use_storage_api(results):
+            started = False
+            try:
+                for batch in results.to_arrow_iterable(bqstorage_client=self._bqstorage_client):
+                    if not started:
+                        started = True
+                        self.download_counts['storage_api'] += 1
+                    yield batch
+                return
             except Exception as e:
-                logger.error(f"❌ Query execution error: {e}")
-                return None
+                if started:
+                    raise
+                self.download_counts['storage_api_fallbacks'] += 1
+                logger.warning(f"⚠️ Storage Read API stream failed, falling back to REST: {e}")
+
+        self.download_counts['rest'] += 1
+        yield from results.to_arrow_iterable()
 
-        return None
+    def _build_query_parameters(self, query_params):
+        """Convert (name, type, value) tuples into BigQuery scalar parameters."""
+        return [
+            _load_bigquery().ScalarQueryParameter(name, param_type, value)
+            for name, param_type, value in query_params
+        ]
 
     def _get_mock_data(self, query_string):
         """
@@ -203,6 +705,17 @@ class DatabaseConnection:
             return {
                 'status': 'mock_mode',
                 'connection': 'simulated',
+                'backend': self._local_engine.stats() if self._local_engine else 'static',
+                'timestamp': datetime.utcnow().isoformat()
+            }
+
+        # An open breaker means queries are failing; report it without probing
+        breaker = self.breaker.stats()
+        if breaker['state'] == CircuitBreaker.OPEN:
+            return {
+                'status': 'circuit_open',
+                'error': 'BigQuery circuit breaker is open',
+                'circuit_breaker': breaker,
                 'timestamp': datetime.utcnow().isoformat()
             }
 
@@ -215,22 +728,20 @@ class DatabaseConnection:
                     'timestamp': datetime.utcnow().isoformat()
                 }
 
-            # Simple query to test connection
-            query = f"SELECT COUNT(*) as record_count FROM `{self.project_id}.{self.dataset_id}.INFORMATION_SCHEMA.TABLES`"
-            result = self.execute_query(query)
-
-            if result:
+            # Cached metadata probe instead of a query on every health check
+            if self.probe():
                 return {
                     'status': 'healthy',
                     'connection': 'active',
                     'project_id': self.project_id,
                     'dataset': self.dataset_id,
+                    'circuit_breaker': breaker,
                     'timestamp': datetime.utcnow().isoformat()
                 }
             else:
                 return {
                     'status': 'unhealthy',
-                    'error': 'Query execution failed',
+                    'error': self._probe_error or 'Connectivity probe failed',
                     'timestamp': datetime.utcnow().isoformat()
                 }
 
@@ -0,0 +1,161 @@
+"""
+BigQuery Job Statistics for CA Lobby API
+
+Captures the statistics BigQuery reports for every query job (bytes
+processed and billed, slot milliseconds, cache hit, per-stage timings) so
+expensive search shapes can be found. Each record goes to:
+
+- a bounded in-memory ring buffer of recent jobs
+- an append-only JSON Lines log (JOB_STATS_LOG_PATH; empty disables)
+- per-template aggregates keyed by the normalized query shape
+
+Aggregates back the /api/admin/query-stats endpoint, which lists the top-N
+most expensive shapes.
+
+Based on:
+- Phase 1.1 logging and monitoring patterns
+- Phase 1.3b DataAccessService cache statistics
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from metrics import query_shape
+
+logger = logging.getLogger(__name__)
+
+# Further templates are folded into 'other'
+MAX_TEMPLATES = 500
+
+ORDER_FIELDS = ('bytes_billed', 'bytes_processed', 'slot_ms', 'elapsed_ms', 'jobs')
+
+
+def _stage_summary(stage) -> Dict:
+    return {
+        'name': stage.name,
+        'status': getattr(stage, 'status', None),
+        'wait_ms': getattr(stage, 'wait_ms_avg', None),
+        'read_ms': getattr(stage, 'read_ms_avg', None),
+        'compute_ms': getattr(stage, 'compute_ms_avg', None),
+        'write_ms': getattr(stage, 'write_ms_avg', None),
+        'records_read': getattr(stage, 'records_read', None),
+        'records_written': getattr(stage, 'records_written', None),
+        'slot_ms': getattr(stage, 'slot_ms', None)
+    }
+
+
+class JobStatsRecorder:
+    """Ring buffer, append-only log and per-template aggregates of BigQuery job stats."""
+
+    def __init__(self, capacity: int = 1000, log_path: Optional[str] = None):
+        self.capacity = capacity
+        self.log_path = log_path
+
+        self._recent = deque(maxlen=capacity)
+        self._templates: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+
+        if log_path:
+            directory = os.path.dirname(log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+    def record(self, query_string: str, query_job, elapsed_seconds: float,
+               priority: Optional[str] = None) -> Dict:
+        """Capture one finished job. Missing statistics are recorded as None."""
+        stages = [_stage_summary(stage) for stage in (getattr(query_job, 'query_plan', None) or [])]
+        entry = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'job_id': getattr(query_job, 'job_id', None),
+            'shape': query_shape(query_string),
+            'priority': priority or 'interactive',
+            'elapsed_ms': round(elapsed_seconds * 1000, 1),
+            'bytes_processed': getattr(query_job, 'total_bytes_processed', None),
+            'bytes_billed': getattr(query_job, 'total_bytes_billed', None),
+            'slot_ms': getattr(query_job, 'slot_millis', None),
+            'cache_hit': getattr(query_job, 'cache_hit', None),
+            'stages': stages
+        }
+
+        with self._lock:
+            self._recent.append(entry)
+            self._aggregate(entry, query_string)
+
+        if self.log_path:
+            self._append_log(entry)
+        return entry
+
+    def _aggregate(self, entry: Dict, query_string: str) -> None:
+        shape = entry['shape']
+        template = self._templates.get(shape)
+        if template is None:
+            if len(self._templates) >= MAX_TEMPLATES:
+                shape = 'other'
+                template = self._templates.get(shape)
+            if template is None:
+                template = self._templates[shape] = {
+                    'shape': shape,
+                    'sql': ' '.join(query_string.split())[:300] if shape != 'other' else None,
+                    'jobs': 0, 'cache_hits': 0, 'bytes_processed': 0, 'bytes_billed': 0,
+                    'slot_ms': 0, 'elapsed_ms': 0.0, 'max_elapsed_ms': 0.0, 'last_seen': None
+                }
+
+        template['jobs'] += 1
+        template['cache_hits'] += 1 if entry['cache_hit'] else 0
+        for field in ('bytes_processed', 'bytes_billed', 'slot_ms'):
+            template[field] += entry[field] or 0
+        template['elapsed_ms'] += entry['elapsed_ms']
+        template['max_elapsed_ms'] = max(template['max_elapsed_ms'], entry['elapsed_ms'])
+        template['last_seen'] = entry['timestamp']
+
+    def _append_log(self, entry: Dict) -> None:
+        try:
+            line = json.dumps(entry, default=str)
+            with self._log_lock, open(self.log_path, 'a', encoding='utf-8') as log_file:
+                log_file.write(line + '\n')
+        except OSError as e:
+            logger.warning(f"⚠️ Could not append job stats log: {e}")
+
+    def recent(self, limit: int = 50) -> List[Dict]:
+        """Most recent jobs, newest first."""
+        with self._lock:
+            return list(self._recent)[-limit:][::-1]
+
+    def top_templates(self, n: int = 10, order_by: str = 'bytes_billed') -> List[Dict]:
+        """The n most expensive query templates by a cumulative field."""
+        if order_by not in ORDER_FIELDS:
+            raise ValueError(f"order_by must be one of: {', '.join(ORDER_FIELDS)}")
+
+        with self._lock:
+            templates = [dict(template) for template in self._templates.values()]
+
+        for template in templates:
+            jobs = template['jobs']
+            template['avg_bytes_billed'] = round(template['bytes_billed'] / jobs) if jobs else 0
+            template['avg_elapsed_ms'] = round(template['elapsed_ms'] / jobs, 1) if jobs else 0
+            template['cache_hit_rate_percent'] = round(template['cache_hits'] / jobs * 100, 1) if jobs else 0
+        templates.sort(key=lambda template: template[order_by], reverse=True)
+        return templates[:n]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'recent_jobs': len(self._recent),
+                'capacity': self.capacity,
+                'templates': len(self._templates),
+                'log_path': self.log_path
+            }
+
+
+def create_job_stats_recorder() -> JobStatsRecorder:
+    """Build the recorder from environment configuration."""
+    return JobStatsRecorder(
+        capacity=int(os.getenv('JOB_STATS_BUFFER_SIZE', 1000)),
+        log_path=os.getenv('JOB_STATS_LOG_PATH', os.path.join('logs', 'bigquery_jobs.jsonl')) or None
+    )
@@ -0,0 +1,211 @@
+"""
+Query Metrics for CA Lobby API
+
+In-process counters and latency histograms for the data access layer:
+cache hits and misses, coalesced waits, and query latency split by where
+the result came from (cache, local replica or BigQuery), with a per-query-
+shape breakdown. Exposed as JSON through /api/cache/stats and in the
+Prometheus text format through /api/cache/metrics.
+
+Based on:
+- Phase 1.3b DataAccessService cache statistics
+- Phase 1.1 logging and monitoring patterns
+"""
+
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Per-shape breakdowns are capped; further shapes are folded into 'other'
+MAX_QUERY_SHAPES = 200
+
+METRIC_PREFIX = 'ca_lobby'
+
+
+def query_shape(query: str) -> str:
+    """Short stable identifier for a query template (whitespace-insensitive)."""
+    normalized = ' '.join(query.split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12]
+
+
+class LatencyHistogram:
+    """Cumulative-bucket latency histogram."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        for index, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[index] += 1
+                return
+        self.counts[-1] += 1
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket containing the given percentile."""
+        if self.count == 0:
+            return None
+        target = fraction * self.count
+        running = 0
+        for index, bucket_count in enumerate(self.counts):
+            running += bucket_count
+            if running >= target:
+                return self.buckets[index] if index < len(self.buckets) else float('inf')
+        return float('inf')
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count * 1000, 2) if self.count else 0,
+            'p50_ms': _to_ms(self.percentile(0.5)),
+            'p95_ms': _to_ms(self.percentile(0.95)),
+            'p99_ms': _to_ms(self.percentile(0.99))
+        }
+
+    def cumulative(self) -> List[int]:
+        running = 0
+        result = []
+        for bucket_count in self.counts:
+            running += bucket_count
+            result.append(running)
+        return result
+
+
+def _to_ms(seconds: Optional[float]):
+    if seconds is None:
+        return None
+    if seconds == float('inf'):
+        return 'inf'
+    return round(seconds * 1000, 2)
+
+
+class QueryMetrics:
+    """Thread-safe registry of cache counters and latency histograms."""
+
+    COUNTERS = ('hits', 'misses', 'stale_hits', 'negative_hits', 'coalesced', 'errors')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {name: 0 for name in self.COUNTERS}
+        self._latency: Dict[str, LatencyHistogram] = {}
+        self._shapes: Dict[str, Dict] = {}
+
+    def increment(self, name: str, amount: int = 1, query: Optional[str] = None) -> None:
+        """Increment a counter, optionally attributing it to a query shape."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+            if query is not None:
+                shape = self._shape_entry(query)
+                shape[name] = shape.get(name, 0) + amount
+
+    def observe(self, source: str, seconds: float, query: Optional[str] = None) -> None:
+        """Record a request latency for a result source (cache, bigquery, replica)."""
+        with self._lock:
+            histogram = self._latency.get(source)
+            if histogram is None:
+                histogram = self._latency[source] = LatencyHistogram()
+            histogram.observe(seconds)
+
+            if query is not None:
+                shape = self._shape_entry(query)
+                shape_histogram = shape['latency'].get(source)
+                if shape_histogram is None:
+                    shape_histogram = shape['latency'][source] = LatencyHistogram()
+                shape_histogram.observe(seconds)
+
+    def _shape_entry(self, query: str) -> Dict:
+        shape_id = query_shape(query)
+        entry = self._shapes.get(shape_id)
+        if entry is None:
+            if len(self._shapes) >= MAX_QUERY_SHAPES:
+                shape_id = 'other'
+                entry = self._shapes.get(shape_id)
+            if entry is None:
+                sample = ' '.join(query.split())[:160] if shape_id != 'other' else None
+                entry = self._shapes[shape_id] = {'sql': sample, 'latency': {}}
+        return entry
+
+    def hit_rate(self) -> float:
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return (self._counters['hits'] / lookups * 100) if lookups else 0.0
+
+    def snapshot(self) -> Dict:
+        """JSON-friendly view of all counters, latencies and shapes."""
+        with self._lock:
+            shapes = {}
+            for shape_id, entry in self._shapes.items():
+                shapes[shape_id] = {
+                    'sql': entry['sql'],
+                    **{name: entry.get(name, 0) for name in self.COUNTERS},
+                    'latency': {source: hist.summary() for source, hist in entry['latency'].items()}
+                }
+
+            return {
+                'counters': dict(self._counters),
+                'latency': {source: hist.summary() for source, hist in self._latency.items()},
+                'query_shapes': shapes
+            }
+
+    def render_prometheus(self, gauges: Optional[Dict[str, float]] = None,
+                          counters: Optional[Dict[str, float]] = None) -> str:
+        """
+        Render metrics in the Prometheus text exposition format.
+        Extra gauges/counters (e.g. cache size, evictions) are supplied by the caller.
+        """
+        lines = []
+        with self._lock:
+            name = f'{METRIC_PREFIX}_cache_requests_total'
+            lines.append(f'# HELP {name} Data service cache lookups and outcomes.')
+            lines.append(f'# TYPE {name} counter')
+            for counter, value in self._counters.items():
+                lines.append(f'{name}{{result="{counter}"}} {value}')
+
+            name = f'{METRIC_PREFIX}_query_duration_seconds'
+            lines.append(f'# HELP {name} Query latency by result source.')
+            lines.append(f'# TYPE {name} histogram')
+            for source, hist in self._latency.items():
+                lines.extend(_histogram_lines(name, f'source="{source}"', hist))
+
+            name = f'{METRIC_PREFIX}_query_shape_requests_total'
+            lines.append(f'# HELP {name} Cache outcomes per query shape.')
+            lines.append(f'# TYPE {name} counter')
+            for shape_id, entry in self._shapes.items():
+                for counter in self.COUNTERS:
+                    if entry.get(counter):
+                        lines.append(f'{name}{{shape="{shape_id}",result="{counter}"}} {entry[counter]}')
+
+            name = f'{METRIC_PREFIX}_query_shape_duration_seconds'
+            lines.append(f'# HELP {name} Query latency per query shape and result source.')
+            lines.append(f'# TYPE {name} histogram')
+            for shape_id, entry in self._shapes.items():
+                for source, hist in entry['latency'].items():
+                    lines.extend(_histogram_lines(name, f'shape="{shape_id}",source="{source}"', hist))
+
+        for metric, value in (counters or {}).items():
+            lines.append(f'# TYPE {METRIC_PREFIX}_{metric} counter')
+            lines.append(f'{METRIC_PREFIX}_{metric} {value}')
+        for metric, value in (gauges or {}).items():
+            lines.append(f'# TYPE {METRIC_PREFIX}_{metric} gauge')
+            lines.append(f'{METRIC_PREFIX}_{metric} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(name: str, labels: str, hist: LatencyHistogram) -> List[str]:
+    lines = []
+    cumulative = hist.cumulative()
+    for bound, value in zip(hist.buckets, cumulative):
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {value}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative[-1]}')
+    lines.append(f'{name}_sum{{{labels}}} {hist.total}')
+    lines.append(f'{name}_count{{{labels}}} {hist.count}')
+    return lines
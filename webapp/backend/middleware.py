@@ -17,6 +17,9 @@ import time
 import traceback
 from datetime import datetime
 
+from cost_guard import QueryTooExpensiveError
+from database import QueryFailedError
+
 logger = logging.getLogger(__name__)
 
 def register_error_handlers(app):
@@ -137,6 +140,26 @@ def handle_api_errors(f):
         try:
             return f(*args, **kwargs)
 
+        except QueryTooExpensiveError as e:
+            logger.warning(f"Query over cost budget in {f.__name__}: {e}")
+            return jsonify({
+                'error': 'Query Too Expensive',
+                'message': str(e),
+                'estimated_bytes': e.estimated_bytes,
+                'max_bytes': e.budget.max_bytes,
+                'status_code': 400,
+                'timestamp': datetime.utcnow().isoformat()
+            }), 400
+
+        except QueryFailedError as e:
+            logger.error(f"Query failed in {f.__name__}: {e}")
+            return jsonify({
+                'error': 'Service Unavailable',
+                'message': 'The query could not be completed, please try again',
+                'status_code': 503,
+                'timestamp': datetime.utcnow().isoformat()
+            }), 503
+
         except ValueError as e:
             logger.warning(f"Validation error in {f.__name__}: {e}")
             return jsonify({
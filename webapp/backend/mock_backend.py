@@ -0,0 +1,212 @@
+"""
+Local SQL Mock Backend for CA Lobby API
+
+With USE_MOCK_DATA=true, queries are executed for real against an embedded
+DuckDB database instead of returning canned rows, so the query builder,
+cache and result pipeline can be exercised and load-tested offline.
+
+Tables are loaded from MOCK_DATA_PATH (a Parquet/CSV file, or a directory
+of them, one table per file named after the file stem, e.g. the output of
+scripts/generate_synthetic_dataset.py). Without it a lobby_data table of
+MOCK_LOBBY_ROWS deterministic synthetic rows is generated at first use.
+
+BigQuery-dialect queries are translated the same way as the local replica:
+backtick table references become bare table names and @name parameters
+become DuckDB $name parameters. Results are returned as a RowIterator
+stand-in (rows, pages, to_arrow, to_arrow_iterable).
+
+Configuration:
+- MOCK_BACKEND: 'sql' (default, requires duckdb and pyarrow) or 'static'
+  for the canned sample rows
+- MOCK_DATA_PATH: Parquet/CSV file or directory to load (default: generate)
+- MOCK_LOBBY_ROWS: rows to generate when no data path is set (default: 10000)
+- MOCK_DATA_SEED: seed for generated rows (default: 42)
+- MOCK_QUERY_LATENCY_MS / MOCK_QUERY_LATENCY_JITTER_MS: artificial job latency
+
+Based on:
+- Phase 1.3b local replica (DuckDB) query translation
+- Phase 1.1 environment variable configuration patterns
+"""
+
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Optional, and only needed in mock mode, so they are loaded by
+# _load_dependencies() rather than on every import of database.py
+duckdb = None
+pyarrow = None
+
+_QUERY_PARAMETER = re.compile(r'@(\w+)')
+# `project.dataset.table` or `dataset.table` -> table
+_TABLE_REFERENCE = re.compile(r'`(?:[\w-]+\.)*(\w+)`')
+
+_DATA_SUFFIXES = {'.parquet': 'read_parquet', '.csv': 'read_csv_auto'}
+
+# Deterministic synthetic lobby_data: hash(id, seed + k) drives every column.
+# Client and lobbyist choice is skewed (cubed uniform) so a few dominate.
+_GENERATE_LOBBY_DATA = """
+CREATE TABLE lobby_data AS
+SELECT
+    i AS id,
+    'Lobbyist ' || CAST(FLOOR(POW((hash(i, {seed}) % 1000000) / 1000000.0, 3) * 400) AS INTEGER) AS lobbyist_name,
+    'Client ' || CAST(FLOOR(POW((hash(i, {seed} + 1) % 1000000) / 1000000.0, 3) * 2000) AS INTEGER) AS client_name,
+    ROUND(EXP(5 + (hash(i, {seed} + 2) % 1000000) / 1000000.0 * 7), 2) AS amount,
+    DATE '2015-01-01' + CAST(hash(i, {seed} + 3) % 3650 AS INTEGER) AS report_date,
+    ['Legislative advocacy', 'Regulatory comment', 'Agency meeting', 'Budget request',
+     'Procurement discussion'][CAST(hash(i, {seed} + 4) % 5 AS INTEGER) + 1]
+        || ' on bill ' || CAST(hash(i, {seed} + 5) % 3000 AS VARCHAR) AS activity_description,
+    ['fee', 'reimbursement', 'salary', 'other'][CAST(hash(i, {seed} + 6) % 4 AS INTEGER) + 1] AS payment_type
+FROM range(1, {rows} + 1) AS t(i)
+"""
+
+
+def _load_dependencies() -> bool:
+    """Import duckdb and pyarrow once. Returns False if they are not installed."""
+    global duckdb, pyarrow
+    if duckdb is None:
+        try:
+            import duckdb as duckdb_module
+            import pyarrow as pyarrow_module
+        except ImportError:  # Mock mode falls back to canned rows without them
+            return False
+        pyarrow = pyarrow_module
+        duckdb = duckdb_module
+    return True
+
+
+class LocalResult:
+    """Stand-in for a BigQuery RowIterator over an Arrow table."""
+
+    def __init__(self, table, page_size: Optional[int] = None):
+        self.table = table
+        self.page_size = page_size or 1000
+        self.total_rows = table.num_rows
+        self._row_type = namedtuple('Row', table.column_names, rename=True)
+
+    def __iter__(self):
+        for batch in self.table.to_batches(max_chunksize=self.page_size):
+            for values in zip(*(column.to_pylist() for column in batch.columns)):
+                yield self._row_type(*values)
+
+    def __len__(self):
+        return self.total_rows
+
+    @property
+    def pages(self):
+        for batch in self.table.to_batches(max_chunksize=self.page_size):
+            yield [self._row_type(*values) for values in zip(*(column.to_pylist() for column in batch.columns))]
+
+    def to_arrow(self, bqstorage_client=None, create_bqstorage_client=True):
+        return self.table
+
+    def to_arrow_iterable(self, bqstorage_client=None, max_queue_size=None):
+        yield from self.table.to_batches(max_chunksize=self.page_size)
+
+
+class LocalQueryEngine:
+    """Embedded DuckDB database that runs BigQuery-dialect queries with simulated latency."""
+
+    def __init__(self, data_path: Optional[str] = None, lobby_rows: int = 10000, seed: int = 42,
+                 latency_ms: float = 0, latency_jitter_ms: float = 0):
+        self.data_path = data_path
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+
+        self._conn = duckdb.connect(database=':memory:')
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._queries_run = 0
+
+        start_time = time.time()
+        if data_path:
+            self.tables = self._load(data_path)
+        else:
+            self._conn.execute(_GENERATE_LOBBY_DATA.format(seed=int(seed), rows=int(lobby_rows)))
+            self.tables = ['lobby_data']
+        logger.info(f"✅ Local mock backend ready with tables {', '.join(self.tables)} "
+                    f"in {time.time() - start_time:.2f}s")
+
+    def _load(self, path: str) -> List[str]:
+        if os.path.isdir(path):
+            # Parquet first, so it wins over a CSV copy of the same table
+            files = sorted((os.path.join(path, name) for name in os.listdir(path)),
+                           key=lambda name: (not name.endswith('.parquet'), name))
+        else:
+            files = [path]
+
+        tables = []
+        for file_path in files:
+            stem, suffix = os.path.splitext(os.path.basename(file_path))
+            reader = _DATA_SUFFIXES.get(suffix.lower())
+            if reader is None or stem in tables:
+                continue
+            quoted_path = "'" + file_path.replace("'", "''") + "'"
+            self._conn.execute(f'CREATE TABLE "{stem}" AS SELECT * FROM {reader}({quoted_path})')
+            tables.append(stem)
+
+        if not tables:
+            raise ValueError(f"No Parquet or CSV tables found at {path}")
+        return tables
+
+    def _simulate_latency(self) -> None:
+        if not self.latency_ms and not self.latency_jitter_ms:
+            return
+        with self._random_lock:
+            jitter = self._random.uniform(0, self.latency_jitter_ms)
+        time.sleep((self.latency_ms + jitter) / 1000)
+
+    def execute(self, query: str, query_params: Optional[List] = None,
+                page_size: Optional[int] = None) -> LocalResult:
+        """Run a BigQuery-dialect query; blocks for the configured latency first."""
+        local_query = _QUERY_PARAMETER.sub(r'$\1', _TABLE_REFERENCE.sub(r'\1', query))
+        params = {name: value for name, _, value in (query_params or [])}
+
+        self._simulate_latency()
+        cursor = self._conn.cursor()
+        try:
+            table = cursor.execute(local_query, params).fetch_arrow_table()
+        finally:
+            cursor.close()
+
+        self._queries_run += 1
+        return LocalResult(table, page_size)
+
+    def stats(self) -> Dict:
+        return {
+            'backend': 'duckdb',
+            'tables': self.tables,
+            'data_path': self.data_path,
+            'latency_ms': self.latency_ms,
+            'latency_jitter_ms': self.latency_jitter_ms,
+            'queries_run': self._queries_run
+        }
+
+
+def create_local_engine() -> Optional[LocalQueryEngine]:
+    """Build the local SQL mock backend, or None to use canned mock rows."""
+    if os.getenv('MOCK_BACKEND', 'sql').lower() != 'sql':
+        return None
+
+    if not _load_dependencies():
+        logger.warning("⚠️ duckdb/pyarrow not installed - mock mode uses static sample rows")
+        return None
+
+    try:
+        return LocalQueryEngine(
+            data_path=os.getenv('MOCK_DATA_PATH') or None,
+            lobby_rows=int(os.getenv('MOCK_LOBBY_ROWS', 10000)),
+            seed=int(os.getenv('MOCK_DATA_SEED', 42)),
+            latency_ms=float(os.getenv('MOCK_QUERY_LATENCY_MS', 0)),
+            latency_jitter_ms=float(os.getenv('MOCK_QUERY_LATENCY_JITTER_MS', 0))
+        )
+    except Exception as e:
+        logger.error(f"❌ Local mock backend failed to start, using static sample rows: {e}")
+        return None
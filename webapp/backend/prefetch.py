@@ -0,0 +1,126 @@
+"""
+Speculative Prefetch for CA Lobby API
+
+Runs low-priority background jobs that warm the cache with results a user
+is likely to ask for next (e.g. page N+1 after page N). Prefetching is
+opt-in and strictly subordinate to live traffic:
+
+- jobs run on a small dedicated pool, never on request threads
+- at most max_in_flight jobs are queued or running; extra ones are dropped
+- a job waits for live queries to drain before starting and is skipped if
+  they do not drain within idle_wait seconds
+
+Configuration:
+- PREFETCH_ENABLED: 'true' to enable (default: false)
+- PREFETCH_WORKERS: background threads (default: 1)
+- PREFETCH_MAX_IN_FLIGHT: cap on queued + running jobs (default: 2)
+- PREFETCH_IDLE_WAIT_SECONDS: how long a job waits for live queries (default: 2)
+
+Based on:
+- Phase 1.3b DataAccessService caching patterns
+- Phase 1.1 environment variable configuration patterns
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """Bounded, lowest-priority background executor for speculative queries."""
+
+    def __init__(self, max_workers: int = 1, max_in_flight: int = 2, idle_wait: float = 2.0):
+        self.max_in_flight = max_in_flight
+        self.idle_wait = idle_wait
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cache-prefetch')
+        self._condition = threading.Condition()
+        self._pending = set()
+        self._live_queries = 0
+        self._counters = {'scheduled': 0, 'completed': 0, 'dropped': 0, 'skipped': 0, 'failed': 0}
+
+    @contextmanager
+    def live_query(self):
+        """Mark a live (user-facing) query as running for the duration of the block."""
+        with self._condition:
+            self._live_queries += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._live_queries -= 1
+                self._condition.notify_all()
+
+    def submit(self, key: str, fn: Callable[[], None]) -> bool:
+        """
+        Queue fn as a speculative job for key.
+        Returns False if the key is already pending or the in-flight cap is reached.
+        """
+        with self._condition:
+            if key in self._pending:
+                return False
+            if len(self._pending) >= self.max_in_flight:
+                self._counters['dropped'] += 1
+                return False
+            self._pending.add(key)
+            self._counters['scheduled'] += 1
+
+        try:
+            self._executor.submit(self._run, key, fn)
+        except RuntimeError:  # Executor shut down
+            with self._condition:
+                self._pending.discard(key)
+            return False
+        return True
+
+    def _run(self, key: str, fn: Callable[[], None]) -> None:
+        try:
+            # Yield to live traffic: start only once no live query is running
+            with self._condition:
+                if not self._condition.wait_for(lambda: self._live_queries == 0, timeout=self.idle_wait):
+                    self._counters['skipped'] += 1
+                    logger.debug(f"Prefetch skipped, live queries busy: {key[:50]}...")
+                    return
+
+            fn()
+            with self._condition:
+                self._counters['completed'] += 1
+        except Exception as e:
+            with self._condition:
+                self._counters['failed'] += 1
+            logger.warning(f"Prefetch failed for key {key[:50]}...: {e}")
+        finally:
+            with self._condition:
+                self._pending.discard(key)
+
+    def stats(self) -> Dict:
+        with self._condition:
+            return {
+                'enabled': True,
+                'pending': len(self._pending),
+                'max_in_flight': self.max_in_flight,
+                'live_queries': self._live_queries,
+                **self._counters
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+def create_prefetcher() -> Optional[Prefetcher]:
+    """Build the prefetcher if PREFETCH_ENABLED is set."""
+    if os.getenv('PREFETCH_ENABLED', 'false').lower() != 'true':
+        return None
+
+    prefetcher = Prefetcher(
+        max_workers=int(os.getenv('PREFETCH_WORKERS', 1)),
+        max_in_flight=int(os.getenv('PREFETCH_MAX_IN_FLIGHT', 2)),
+        idle_wait=float(os.getenv('PREFETCH_IDLE_WAIT_SECONDS', 2))
+    )
+    logger.info(f"Next-page prefetch enabled (max in flight: {prefetcher.max_in_flight})")
+    return prefetcher
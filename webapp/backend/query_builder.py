@@ -0,0 +1,191 @@
+"""
+Query Builder for CA Lobby API
+
+Builds parameterized SQL for lobby data searches. Each combination of
+filters present (the query "shape") maps to one fixed SQL template, and
+filter values are bound as BigQuery query parameters rather than
+interpolated into the text. Identical shapes therefore produce identical
+SQL, which lets BigQuery's result cache and our own cache keys line up,
+and removes quoting concerns from user-supplied values.
+
+Compiled templates are cached per shape.
+
+Based on:
+- Phase 1.3b DataAccessService query building patterns
+- Phase 1.1 data selection patterns
+"""
+
+import logging
+from collections import namedtuple
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A single named query parameter; type is a BigQuery standard SQL type name
+QueryParameter = namedtuple('QueryParameter', ['name', 'type', 'value'])
+
+# SQL template, the parameters to bind to it, and cache invalidation tags
+BoundQuery = namedtuple('BoundQuery', ['sql', 'params', 'tags'], defaults=[()])
+
+LOBBY_COLUMNS = [
+    'lobbyist_name',
+    'client_name',
+    'amount',
+    'report_date',
+    'activity_description',
+    'payment_type'
+]
+
+# filter name -> (SQL predicate, parameter type, value transform)
+LOBBY_FILTERS = {
+    'lobbyist_name': ("LOWER(lobbyist_name) LIKE @lobbyist_name", 'STRING',
+                      lambda value: f"%{str(value).lower()}%"),
+    'client_name': ("LOWER(client_name) LIKE @client_name", 'STRING',
+                    lambda value: f"%{str(value).lower()}%"),
+    'amount_min': ("amount >= @amount_min", 'FLOAT64', float),
+    'amount_max': ("amount <= @amount_max", 'FLOAT64', float),
+    'date_from': ("report_date >= @date_from", 'DATE', lambda value: _to_date(value)),
+    'date_to': ("report_date <= @date_to", 'DATE', lambda value: _to_date(value)),
+}
+
+# Date ranges spanning more years than this are tagged as open-ended
+MAX_TAGGED_YEARS = 50
+
+SEEK_CLAUSE = (
+    "(report_date < @after_date"
+    " OR (report_date = @after_date AND amount < @after_amount)"
+    " OR (report_date = @after_date AND amount = @after_amount AND id < @after_id))"
+)
+
+
+def _to_date(value: Any) -> date:
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _filter_shape(filters: Optional[Dict]) -> Tuple[str, ...]:
+    """Sorted names of the supported filters present in a filter dict."""
+    if not filters:
+        return ()
+    return tuple(sorted(name for name in filters if name in LOBBY_FILTERS))
+
+
+@lru_cache(maxsize=256)
+def compile_lobby_template(table: str, shape: Tuple[str, ...], include_total: bool = False,
+                           keyset: bool = False, seek: bool = False) -> str:
+    """
+    Compile the page query template for one filter shape.
+    Cached: every request with the same shape reuses the same SQL string.
+    """
+    columns = list(LOBBY_COLUMNS)
+    if keyset:
+        columns.append('id')
+    if include_total:
+        columns.append('COUNT(*) OVER () AS total_count')
+
+    sql = "SELECT " + ", ".join(columns) + f" FROM {table}"
+
+    where_clauses = [LOBBY_FILTERS[name][0] for name in shape]
+    if seek:
+        where_clauses.append(SEEK_CLAUSE)
+    if where_clauses:
+        sql += " WHERE " + " AND ".join(where_clauses)
+
+    # id breaks ties so keyset pages are stable
+    if keyset:
+        sql += " ORDER BY report_date DESC, amount DESC, id DESC LIMIT @limit"
+    else:
+        sql += " ORDER BY report_date DESC, amount DESC LIMIT @limit OFFSET @offset"
+
+    logger.debug(f"Compiled lobby query template for shape {shape} (keyset: {keyset}, seek: {seek})")
+    return sql
+
+
+@lru_cache(maxsize=256)
+def compile_lobby_count_template(table: str, shape: Tuple[str, ...]) -> str:
+    """Compile the count query template for one filter shape."""
+    sql = f"SELECT COUNT(*) as total FROM {table}"
+    where_clauses = [LOBBY_FILTERS[name][0] for name in shape]
+    if where_clauses:
+        sql += " WHERE " + " AND ".join(where_clauses)
+    return sql
+
+
+def lobby_cache_tags(filters: Optional[Dict]) -> Tuple[str, ...]:
+    """
+    Invalidation tags for a lobby query: the source table, each filter
+    field, and the report years its date range can touch. A range that is
+    open on either side is tagged year:open, so reloading any period also
+    invalidates unbounded queries.
+    """
+    shape = _filter_shape(filters)
+    tags = ['table:lobby_data'] + [f'filter:{name}' for name in shape]
+
+    first_year = _to_date(filters['date_from']).year if 'date_from' in shape else None
+    last_year = _to_date(filters['date_to']).year if 'date_to' in shape else None
+    if first_year is not None and last_year is not None and 0 <= last_year - first_year <= MAX_TAGGED_YEARS:
+        tags.extend(f'year:{year}' for year in range(first_year, last_year + 1))
+    else:
+        tags.append('year:open')
+
+    return tuple(tags)
+
+
+class LobbyQueryBuilder:
+    """Builds bound page and count queries against the lobby_data table."""
+
+    def __init__(self, table: str):
+        self.table = table
+
+    def _filter_params(self, filters: Optional[Dict], shape: Tuple[str, ...]) -> List[QueryParameter]:
+        params = []
+        for name in shape:
+            _, param_type, transform = LOBBY_FILTERS[name]
+            params.append(QueryParameter(name, param_type, transform(filters[name])))
+        return params
+
+    def build_page(self, filters: Optional[Dict] = None, limit: int = 1000, offset: int = 0,
+                   include_total: bool = False, after: Optional[tuple] = None) -> BoundQuery:
+        """
+        Bound page query.
+        after=(report_date, amount, id) seeks past a keyset position; an empty
+        tuple requests the first keyset page.
+        """
+        shape = _filter_shape(filters)
+        keyset = after is not None
+        sql = compile_lobby_template(self.table, shape, include_total, keyset, bool(after))
+
+        params = self._filter_params(filters, shape)
+        if after:
+            report_date, amount, row_id = after
+            params.extend([
+                QueryParameter('after_date', 'DATE', _to_date(report_date)),
+                QueryParameter('after_amount', 'FLOAT64', float(amount)),
+                QueryParameter('after_id', 'INT64' if isinstance(row_id, int) else 'STRING', row_id),
+            ])
+        params.append(QueryParameter('limit', 'INT64', int(limit)))
+        if not keyset:
+            params.append(QueryParameter('offset', 'INT64', int(offset)))
+
+        return BoundQuery(sql, params, lobby_cache_tags(filters))
+
+    def build_count(self, filters: Optional[Dict] = None) -> BoundQuery:
+        """Bound count query for a filter set."""
+        shape = _filter_shape(filters)
+        return BoundQuery(compile_lobby_count_template(self.table, shape),
+                          self._filter_params(filters, shape), lobby_cache_tags(filters))
+
+    @staticmethod
+    def template_cache_info() -> Dict:
+        """Hit/miss statistics for the compiled template caches."""
+        page_info = compile_lobby_template.cache_info()
+        count_info = compile_lobby_count_template.cache_info()
+        return {
+            'page_templates': page_info.currsize,
+            'count_templates': count_info.currsize,
+            'hits': page_info.hits + count_info.hits,
+            'misses': page_info.misses + count_info.misses
+        }
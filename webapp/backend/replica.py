@@ -0,0 +1,257 @@
+"""
+Local Lobby Data Replica for CA Lobby API
+
+Optional serving mode that answers lobby searches from a local copy of the
+lobby_data table instead of BigQuery. The copy is a Parquet file queried
+through an embedded DuckDB engine, kept current by a background sync job
+that pulls only rows newer than the local watermark.
+
+BigQuery stays the source of truth: queries fall back to it whenever the
+replica is missing, older than LOCAL_REPLICA_MAX_STALENESS_SECONDS, or
+fails to execute a query.
+
+Configuration:
+- LOCAL_REPLICA_ENABLED: 'true' to enable (requires duckdb and pyarrow)
+- LOCAL_REPLICA_PATH: directory for the Parquet files (default: replica)
+- LOCAL_REPLICA_SYNC_INTERVAL_SECONDS: background sync period (default: 900)
+- LOCAL_REPLICA_MAX_STALENESS_SECONDS: serve only if synced within (default: 3600)
+
+Based on:
+- Phase 1.3b DataAccessService query patterns
+- Phase 1.1 large dataset processing patterns
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Optional, and only needed once the replica is enabled, so they are loaded
+# by _load_dependencies() rather than on every app import
+duckdb = None
+pyarrow = None
+pq = None
+
+_QUERY_PARAMETER = re.compile(r'@(\w+)')
+
+
+def _load_dependencies() -> bool:
+    """Import duckdb and pyarrow once. Returns False if they are not installed."""
+    global duckdb, pyarrow, pq
+    if duckdb is None:
+        try:
+            import duckdb as duckdb_module
+            import pyarrow as pyarrow_module
+            import pyarrow.parquet as parquet_module
+        except ImportError:
+            return False
+        pyarrow, pq = pyarrow_module, parquet_module
+        duckdb = duckdb_module
+    return True
+
+
+def _sql_path(path: str) -> str:
+    """Quote a file path as a DuckDB string literal."""
+    return "'" + path.replace("'", "''") + "'"
+
+
+class LobbyReplica:
+    """Parquet + DuckDB replica of lobby_data with incremental sync."""
+
+    def __init__(self, db, table_ref: str, directory: str, sync_interval: float = 900,
+                 max_staleness: float = 3600, watermark_column: str = 'report_date',
+                 key_column: str = 'id'):
+        self.db = db
+        self.table_ref = table_ref
+        self.directory = directory
+        self.sync_interval = sync_interval
+        self.max_staleness = max_staleness
+        self.watermark_column = watermark_column
+        self.key_column = key_column
+
+        os.makedirs(directory, exist_ok=True)
+        self.data_path = os.path.join(directory, 'lobby_data.parquet')
+
+        self._conn = duckdb.connect(database=':memory:')
+        self._sync_lock = threading.Lock()
+        self._last_sync = None
+        self._last_sync_rows = 0
+        self._last_error = None
+        self._queries_served = 0
+        self._stop_event = threading.Event()
+        self._sync_thread = None
+
+        if os.path.exists(self.data_path):
+            self._create_view()
+            # An existing file is only trusted as fresh as its mtime
+            self._last_sync = os.path.getmtime(self.data_path)
+
+    def _create_view(self) -> None:
+        self._run(f"CREATE OR REPLACE VIEW lobby_data AS SELECT * FROM read_parquet({_sql_path(self.data_path)})")
+
+    def _run(self, statement: str):
+        """Execute a statement on its own cursor; cursors are safe across threads."""
+        cursor = self._conn.cursor()
+        try:
+            return cursor.execute(statement).fetchall()
+        finally:
+            cursor.close()
+
+    def is_fresh(self) -> bool:
+        """True if the replica exists and was synced recently enough to serve."""
+        return self._last_sync is not None and (time.time() - self._last_sync) < self.max_staleness
+
+    def can_serve(self, query: str) -> bool:
+        """True if the query targets lobby_data and the replica is fresh."""
+        return self.table_ref in query and self.is_fresh()
+
+    def execute(self, query: str, query_params: Optional[List] = None):
+        """
+        Run a BigQuery-dialect lobby query locally and return an Arrow table.
+        Backtick table references and @name parameters are translated to
+        DuckDB equivalents.
+        """
+        local_query = _QUERY_PARAMETER.sub(r'$\1', query.replace(self.table_ref, 'lobby_data'))
+        params = {name: value for name, _, value in (query_params or [])}
+
+        cursor = self._conn.cursor()
+        try:
+            table = cursor.execute(local_query, params).fetch_arrow_table()
+        finally:
+            cursor.close()
+
+        self._queries_served += 1
+        return table
+
+    def sync(self) -> int:
+        """
+        Pull rows at or after the local watermark from BigQuery and merge
+        them into the Parquet file, keeping the newest copy of each key.
+        Returns the number of rows fetched.
+        """
+        with self._sync_lock:
+            start_time = time.time()
+            watermark = self._local_watermark()
+
+            query = f"SELECT * FROM {self.table_ref}"
+            query_params = None
+            if watermark is not None:
+                # Re-read the watermark day so late rows for it are picked up
+                query += f" WHERE {self.watermark_column} >= @watermark"
+                query_params = [('watermark', 'DATE', watermark)]
+
+            results = self.db.execute_query(query, query_params=query_params)
+            if results is None:
+                raise RuntimeError('Replica sync query returned no results')
+
+            delta = self._to_arrow(results)
+            if delta.num_rows or not os.path.exists(self.data_path):
+                self._merge(delta)
+
+            self._last_sync = time.time()
+            self._last_sync_rows = delta.num_rows
+            self._last_error = None
+            logger.info(f"✅ Local replica synced: {delta.num_rows} rows in {time.time() - start_time:.2f}s")
+            return delta.num_rows
+
+    def _local_watermark(self):
+        if not os.path.exists(self.data_path):
+            return None
+        rows = self._run(f"SELECT MAX({self.watermark_column}) FROM lobby_data")
+        return rows[0][0] if rows else None
+
+    def _to_arrow(self, results):
+        if hasattr(results, 'to_arrow'):
+            # Full syncs are large; the database layer uses the Storage Read API for them
+            return self.db.to_arrow(results)
+        # Mock data and other row iterables
+        return pyarrow.Table.from_pylist([
+            row._asdict() if hasattr(row, '_asdict') else dict(row) for row in results
+        ])
+
+    def _merge(self, delta) -> None:
+        staging_path = os.path.join(self.directory, 'lobby_data.delta.parquet')
+        merged_path = os.path.join(self.directory, 'lobby_data.merged.parquet')
+        pq.write_table(delta, staging_path)
+
+        sources = f"SELECT *, 1 AS _replica_source FROM read_parquet({_sql_path(staging_path)})"
+        if os.path.exists(self.data_path):
+            sources = (f"SELECT *, 0 AS _replica_source FROM read_parquet({_sql_path(self.data_path)}) "
+                       f"UNION ALL BY NAME {sources}")
+
+        self._run(
+            f"COPY (SELECT * EXCLUDE (_replica_source) FROM ({sources}) "
+            f"QUALIFY ROW_NUMBER() OVER (PARTITION BY {self.key_column} ORDER BY _replica_source DESC) = 1) "
+            f"TO {_sql_path(merged_path)} (FORMAT PARQUET)"
+        )
+        os.replace(merged_path, self.data_path)
+        os.remove(staging_path)
+        self._create_view()
+
+    def start_sync(self) -> None:
+        """Start the background sync job (idempotent)."""
+        if self._sync_thread is not None and self._sync_thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._sync_thread = threading.Thread(target=self._sync_loop, name='replica-sync', daemon=True)
+        self._sync_thread.start()
+        logger.info(f"Local replica sync started (interval: {self.sync_interval}s)")
+
+    def stop_sync(self) -> None:
+        self._stop_event.set()
+
+    def _sync_loop(self) -> None:
+        # Sync immediately at startup, then on every interval
+        while True:
+            try:
+                self.sync()
+            except Exception as e:
+                self._last_error = str(e)
+                logger.error(f"❌ Local replica sync failed: {e}")
+            if self._stop_event.wait(self.sync_interval):
+                return
+
+    def status(self) -> Dict:
+        """Replica freshness and usage information."""
+        size_bytes = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+        return {
+            'enabled': True,
+            'fresh': self.is_fresh(),
+            'path': self.data_path,
+            'size_bytes': size_bytes,
+            'last_sync': datetime.utcfromtimestamp(self._last_sync).isoformat() if self._last_sync else None,
+            'last_sync_rows': self._last_sync_rows,
+            'last_error': self._last_error,
+            'queries_served': self._queries_served,
+            'max_staleness_seconds': self.max_staleness
+        }
+
+
+def create_replica(db, table_ref: str) -> Optional[LobbyReplica]:
+    """Build and start the local replica if enabled and its dependencies are installed."""
+    if os.getenv('LOCAL_REPLICA_ENABLED', 'false').lower() != 'true':
+        return None
+
+    if not _load_dependencies():
+        logger.warning("⚠️ LOCAL_REPLICA_ENABLED but duckdb/pyarrow not installed - replica disabled")
+        return None
+
+    try:
+        replica = LobbyReplica(
+            db,
+            table_ref,
+            os.getenv('LOCAL_REPLICA_PATH', 'replica'),
+            sync_interval=float(os.getenv('LOCAL_REPLICA_SYNC_INTERVAL_SECONDS', 900)),
+            max_staleness=float(os.getenv('LOCAL_REPLICA_MAX_STALENESS_SECONDS', 3600))
+        )
+        replica.start_sync()
+        return replica
+    except Exception as e:
+        logger.error(f"❌ Local replica unavailable: {e}")
+        return None
@@ -0,0 +1,212 @@
+"""
+Resilience Helpers for CA Lobby API
+
+Failure handling around BigQuery query execution:
+
+- classify_error sorts failures into transient, rate-limited, quota,
+  client and unknown errors, which decides whether to retry and whether
+  the failure says anything about BigQuery's health
+- DecorrelatedJitterBackoff spreads retries out so workers that failed
+  together do not retry together
+- CircuitBreaker tracks the failure rate over a sliding window; when it
+  trips, calls fail fast until a half-open trial call succeeds
+
+Based on:
+- Phase 1.1 error handling and retry patterns
+- Phase 1.1 environment variable configuration patterns
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from google.api_core import exceptions as api_exceptions
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT = 'transient'
+RATE_LIMITED = 'rate_limited'
+QUOTA = 'quota'
+CLIENT = 'client'
+UNKNOWN = 'unknown'
+
+# Worth retrying after a pause
+RETRYABLE_ERRORS = frozenset([TRANSIENT, RATE_LIMITED])
+# Say something about BigQuery's health, so they count against the breaker
+BREAKER_ERRORS = frozenset([TRANSIENT, RATE_LIMITED, QUOTA, UNKNOWN])
+
+_RATE_LIMIT_REASONS = {'rateLimitExceeded', 'jobRateLimitExceeded'}
+_QUOTA_REASONS = {'quotaExceeded', 'billingTierLimitExceeded', 'accessDenied', 'billingNotEnabled'}
+_CLIENT_REASONS = {'invalidQuery', 'invalid', 'notFound', 'bytesBilledLimitExceeded',
+                   'responseTooLarge', 'duplicate'}
+_TRANSIENT_REASONS = {'backendError', 'internalError'}
+
+
+def classify_error(error: BaseException) -> str:
+    """Classify a query failure; see the module docstring for the categories."""
+    reasons = {item.get('reason') for item in (getattr(error, 'errors', None) or [])
+               if isinstance(item, dict)}
+
+    if reasons & _RATE_LIMIT_REASONS:
+        return RATE_LIMITED
+    if reasons & _QUOTA_REASONS:
+        return QUOTA
+    if reasons & _CLIENT_REASONS:
+        return CLIENT
+    if reasons & _TRANSIENT_REASONS:
+        return TRANSIENT
+
+    if isinstance(error, api_exceptions.TooManyRequests):
+        return RATE_LIMITED
+    if isinstance(error, (api_exceptions.ServerError, api_exceptions.DeadlineExceeded,
+                          api_exceptions.ServiceUnavailable, api_exceptions.RetryError)):
+        return TRANSIENT
+    if isinstance(error, api_exceptions.Forbidden):
+        return QUOTA
+    if isinstance(error, api_exceptions.ClientError):
+        return CLIENT
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return TRANSIENT
+    return UNKNOWN
+
+
+class DecorrelatedJitterBackoff:
+    """
+    Decorrelated jitter: each delay is drawn uniformly from
+    [base, 3 * previous delay] and capped, so delays grow but are spread out.
+    """
+
+    def __init__(self, base: float = 1.0, cap: float = 30.0, rng: Optional[random.Random] = None):
+        self.base = base
+        self.cap = cap
+        self._random = rng or random.Random()
+
+    def next_delay(self, previous: Optional[float] = None) -> float:
+        previous = previous or self.base
+        return min(self.cap, self._random.uniform(self.base, previous * 3))
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling BigQuery while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker.
+
+    closed:    calls pass; outcomes are kept for window_seconds. Once at
+               least min_calls are recorded and the failure ratio reaches
+               failure_ratio, the breaker opens.
+    open:      calls are refused for open_seconds.
+    half_open: up to half_open_calls trial calls pass; a success closes the
+               breaker, a failure reopens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_ratio: float = 0.5, min_calls: int = 10, window_seconds: float = 60,
+                 open_seconds: float = 30, half_open_calls: int = 1, name: str = 'bigquery'):
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._outcomes = deque()  # (monotonic time, succeeded)
+        self._opened_at = None
+        self._trials_started = 0
+        self._trial_started_at = None
+        self._counters = {'opened': 0, 'rejected': 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._advance(time.monotonic())
+            return self._state
+
+    def allow(self) -> bool:
+        """True if a call may proceed. Refused calls are counted."""
+        now = time.monotonic()
+        with self._lock:
+            self._advance(now)
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.HALF_OPEN:
+                # A trial that never reported back does not block forever
+                trial_expired = (self._trial_started_at is not None
+                                 and now - self._trial_started_at > self.open_seconds)
+                if self._trials_started < self.half_open_calls or trial_expired:
+                    self._trials_started = 1 if trial_expired else self._trials_started + 1
+                    self._trial_started_at = now
+                    return True
+
+            self._counters['rejected'] += 1
+            return False
+
+    def record_success(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                logger.info(f"✅ Circuit breaker '{self.name}' closed after successful trial call")
+                self._state = self.CLOSED
+                self._outcomes.clear()
+            self._outcomes.append((now, True))
+            self._trim(now)
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._open(now, 'trial call failed')
+                return
+            self._outcomes.append((now, False))
+            self._trim(now)
+
+            if self._state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = sum(1 for _, succeeded in self._outcomes if not succeeded)
+                if failures / len(self._outcomes) >= self.failure_ratio:
+                    self._open(now, f"{failures}/{len(self._outcomes)} calls failed")
+
+    def _open(self, now: float, reason: str) -> None:
+        self._state = self.OPEN
+        self._opened_at = now
+        self._trials_started = 0
+        self._trial_started_at = None
+        self._counters['opened'] += 1
+        logger.error(f"❌ Circuit breaker '{self.name}' opened: {reason}")
+
+    def _advance(self, now: float) -> None:
+        if self._state == self.OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._trials_started = 0
+            self._trial_started_at = None
+            logger.info(f"Circuit breaker '{self.name}' half-open, allowing trial calls")
+
+    def _trim(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            self._advance(now)
+            self._trim(now)
+            failures = sum(1 for _, succeeded in self._outcomes if not succeeded)
+            return {
+                'state': self._state,
+                'window_calls': len(self._outcomes),
+                'window_failures': failures,
+                'failure_ratio': round(failures / len(self._outcomes), 3) if self._outcomes else 0.0,
+                'open_for_seconds': round(max(0.0, self.open_seconds - (now - self._opened_at)), 1)
+                if self._state == self.OPEN else 0.0,
+                **self._counters
+            }
@@ -0,0 +1,321 @@
+"""
+Shared Query Cache Backends for CA Lobby API
+
+Second-level cache shared between processes so every gunicorn worker on a
+node (and, with a network store, every node) can serve results another
+worker already fetched from BigQuery. The per-process ResultCache stays in
+front as the first level; these backends only see local misses.
+
+Backends are selected with SHARED_CACHE_BACKEND:
+- none   (default) no shared cache
+- sqlite on-disk store at SHARED_CACHE_PATH, safe for concurrent workers
+- redis  any Redis-protocol server at SHARED_CACHE_URL (requires `redis`)
+
+Based on:
+- Phase 1.3b DataAccessService caching patterns
+- Phase 1.1 environment variable configuration patterns
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# A shared cache hit: the stored value, the tags it was stored with, and
+# seconds until it expires in the shared store (None if unknown)
+SharedEntry = namedtuple('SharedEntry', ['data', 'tags', 'ttl'])
+
+
+class SharedCacheBackend(ABC):
+    """Interface for cross-process cache stores. Values must be JSON-serializable."""
+
+    name = 'none'
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[SharedEntry]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, data: Any, ttl: float, tags: Optional[Iterable[str]] = None) -> bool:
+        """Store data for ttl seconds. With tags=None, tags already stored for the key are kept."""
+
+    @abstractmethod
+    def invalidate_tags(self, tags: Iterable[str], match: str = 'any') -> int:
+        """Delete entries carrying any (or all) of the tags. Returns the count removed."""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def clear(self) -> int:
+        ...
+
+    @abstractmethod
+    def keys(self) -> List[str]:
+        ...
+
+    def stats(self) -> Dict:
+        return {'backend': self.name}
+
+
+class SQLiteSharedCache(SharedCacheBackend):
+    """
+    On-disk cache in a SQLite database in WAL mode.
+    Each thread gets its own connection; writers are serialized by SQLite.
+    """
+
+    name = 'sqlite'
+    prune_every = 500  # writes between expired-row cleanups
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS query_cache ('
+            ' cache_key TEXT PRIMARY KEY,'
+            ' payload TEXT NOT NULL,'
+            ' expires_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_query_cache_expires ON query_cache (expires_at)')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS query_cache_tags ('
+            ' tag TEXT NOT NULL,'
+            ' cache_key TEXT NOT NULL,'
+            ' PRIMARY KEY (tag, cache_key))'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_query_cache_tags_key ON query_cache_tags (cache_key)')
+        conn.commit()
+        logger.info(f"✅ Shared SQLite cache ready: {path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[SharedEntry]:
+        conn = self._connection()
+        row = conn.execute(
+            'SELECT payload, expires_at FROM query_cache WHERE cache_key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        payload, expires_at = row
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            self.delete(key)
+            return None
+
+        tags = [tag for (tag,) in conn.execute(
+            'SELECT tag FROM query_cache_tags WHERE cache_key = ?', (key,)
+        ).fetchall()]
+        return SharedEntry(json.loads(payload), tags, remaining)
+
+    def set(self, key: str, data: Any, ttl: float, tags: Optional[Iterable[str]] = None) -> bool:
+        payload = json.dumps(data, default=str)
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO query_cache (cache_key, payload, expires_at) VALUES (?, ?, ?)',
+            (key, payload, time.time() + ttl)
+        )
+        if tags is not None:
+            conn.execute('DELETE FROM query_cache_tags WHERE cache_key = ?', (key,))
+            conn.executemany(
+                'INSERT OR IGNORE INTO query_cache_tags (tag, cache_key) VALUES (?, ?)',
+                [(tag, key) for tag in tags]
+            )
+        conn.commit()
+
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            self.prune_expired()
+        return True
+
+    def delete(self, key: str) -> bool:
+        conn = self._connection()
+        cursor = conn.execute('DELETE FROM query_cache WHERE cache_key = ?', (key,))
+        conn.execute('DELETE FROM query_cache_tags WHERE cache_key = ?', (key,))
+        conn.commit()
+        return cursor.rowcount > 0
+
+    def invalidate_tags(self, tags: Iterable[str], match: str = 'any') -> int:
+        tags = list(tags)
+        if not tags:
+            return 0
+
+        placeholders = ', '.join('?' for _ in tags)
+        having = f' HAVING COUNT(DISTINCT tag) = {len(set(tags))}' if match == 'all' else ''
+        conn = self._connection()
+        keys = [row[0] for row in conn.execute(
+            f'SELECT cache_key FROM query_cache_tags WHERE tag IN ({placeholders}) GROUP BY cache_key{having}',
+            tags
+        ).fetchall()]
+
+        removed = 0
+        for key in keys:
+            removed += conn.execute('DELETE FROM query_cache WHERE cache_key = ?', (key,)).rowcount
+            conn.execute('DELETE FROM query_cache_tags WHERE cache_key = ?', (key,))
+        conn.commit()
+        return removed
+
+    def clear(self) -> int:
+        conn = self._connection()
+        cursor = conn.execute('DELETE FROM query_cache')
+        conn.execute('DELETE FROM query_cache_tags')
+        conn.commit()
+        return cursor.rowcount
+
+    def keys(self) -> List[str]:
+        rows = self._connection().execute(
+            'SELECT cache_key FROM query_cache WHERE expires_at > ?', (time.time(),)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def prune_expired(self) -> int:
+        """Delete expired rows so the file does not grow without bound."""
+        conn = self._connection()
+        cursor = conn.execute('DELETE FROM query_cache WHERE expires_at <= ?', (time.time(),))
+        conn.execute('DELETE FROM query_cache_tags WHERE cache_key NOT IN (SELECT cache_key FROM query_cache)')
+        conn.commit()
+        return cursor.rowcount
+
+    def stats(self) -> Dict:
+        entries = self._connection().execute('SELECT COUNT(*) FROM query_cache').fetchone()[0]
+        size_bytes = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return {'backend': self.name, 'path': self.path, 'entries': entries, 'size_bytes': size_bytes}
+
+
+class RedisSharedCache(SharedCacheBackend):
+    """Cache stored in a Redis-protocol server, shared across nodes."""
+
+    name = 'redis'
+
+    def __init__(self, url: str, prefix: str = 'ca_lobby:'):
+        import redis  # Optional dependency, only needed for this backend
+
+        self.url = url
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+        self.client.ping()
+        logger.info(f"✅ Shared Redis cache ready: {url}")
+
+    def get(self, key: str) -> Optional[SharedEntry]:
+        pipeline = self.client.pipeline()
+        pipeline.get(self.prefix + key)
+        pipeline.smembers(self._entry_tags_key(key))
+        pipeline.ttl(self.prefix + key)
+        payload, tags, remaining = pipeline.execute()
+        if payload is None:
+            return None
+        # TTL is -1 for keys without an expiry
+        return SharedEntry(json.loads(payload), [tag.decode() for tag in tags],
+                           remaining if remaining >= 0 else None)
+
+    def set(self, key: str, data: Any, ttl: float, tags: Optional[Iterable[str]] = None) -> bool:
+        payload = json.dumps(data, default=str)
+        expires_in = max(1, int(ttl))
+
+        pipeline = self.client.pipeline()
+        pipeline.set(self.prefix + key, payload, ex=expires_in)
+        # Per-entry tag set so hits can be promoted with their tags. Without
+        # tags (e.g. a background refresh) the stored ones are kept
+        if tags is not None:
+            tags = list(tags)
+            pipeline.delete(self._entry_tags_key(key))
+            if tags:
+                pipeline.sadd(self._entry_tags_key(key), *tags)
+            for tag in tags:
+                pipeline.sadd(self._tag_key(tag), key)
+        pipeline.expire(self._entry_tags_key(key), expires_in)
+        return bool(pipeline.execute()[0])
+
+    def _tag_key(self, tag: str) -> str:
+        return f'{self.prefix}tag:{tag}'
+
+    def _entry_tags_key(self, key: str) -> str:
+        return f'{self.prefix}tags-of:{key}'
+
+    def _is_index_key(self, name: bytes) -> bool:
+        name = name.decode()
+        return name.startswith(self._tag_key('')) or name.startswith(self._entry_tags_key(''))
+
+    def invalidate_tags(self, tags: Iterable[str], match: str = 'any') -> int:
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        if not tag_keys:
+            return 0
+
+        members = self.client.sinter(tag_keys) if match == 'all' else self.client.sunion(tag_keys)
+        keys = [member.decode() for member in members]
+        removed = self.client.delete(*[self.prefix + key for key in keys]) if keys else 0
+        if keys:
+            self.client.delete(*[self._entry_tags_key(key) for key in keys])
+            # Index sets may still reference expired keys; drop the removed ones
+            pipeline = self.client.pipeline()
+            for tag_key in tag_keys:
+                pipeline.srem(tag_key, *keys)
+            pipeline.execute()
+        return removed
+
+    def delete(self, key: str) -> bool:
+        removed = self.client.delete(self.prefix + key) > 0
+        self.client.delete(self._entry_tags_key(key))
+        return removed
+
+    def clear(self) -> int:
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        entries = [key for key in keys if not self._is_index_key(key)]
+        if keys:
+            self.client.delete(*keys)
+        return len(entries)
+
+    def keys(self) -> List[str]:
+        return [
+            key.decode()[len(self.prefix):]
+            for key in self.client.scan_iter(match=self.prefix + '*')
+            if not self._is_index_key(key)
+        ]
+
+    def stats(self) -> Dict:
+        # DBSIZE is O(1); it counts every key in the database, tag index sets included
+        return {'backend': self.name, 'url': self.url, 'db_keys': self.client.dbsize()}
+
+
+def create_shared_cache() -> Optional[SharedCacheBackend]:
+    """
+    Build the shared cache backend configured in the environment.
+    Returns None when disabled or when the backend cannot be initialized,
+    so the service falls back to per-process caching.
+    """
+    backend = os.getenv('SHARED_CACHE_BACKEND', 'none').lower()
+
+    try:
+        if backend == 'sqlite':
+            return SQLiteSharedCache(os.getenv('SHARED_CACHE_PATH', os.path.join('cache', 'query_cache.sqlite3')))
+        if backend == 'redis':
+            return RedisSharedCache(os.getenv('SHARED_CACHE_URL', 'redis://localhost:6379/0'))
+    except Exception as e:
+        logger.error(f"❌ Shared cache backend '{backend}' unavailable, using local cache only: {e}")
+        return None
+
+    if backend != 'none':
+        logger.warning(f"⚠️ Unknown SHARED_CACHE_BACKEND '{backend}' - shared cache disabled")
+    return None